@@ -5,6 +5,7 @@
     "data" : [
         "security/hms_security.xml",
         "security/ir.model.access.csv",
+        "data/hms_patient_cron.xml",
         "views/hms_patient_view.xml",
         "views/hms_department_view.xml",
         "views/hms_doctor_view.xml",
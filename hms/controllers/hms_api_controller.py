@@ -1,44 +1,165 @@
-from odoo import http
+import json
+
+from odoo import api, fields as odoo_fields, http
 from odoo.http import request
+from odoo.modules.registry import Registry
+
+from ..models.hms_patient import PATIENT_API_DEFAULT_FIELDS, PATIENT_API_FIELDS
+
+DEFAULT_PAGE_SIZE = 80
+MAX_PAGE_SIZE = 500
+EXPORT_CHUNK_SIZE = 1000
+
 
 class HmsPatientController(http.Controller):
 
+    def _parse_api_fields(self, fields):
+        """Normalize the `fields=` projection (list or comma separated string)."""
+        if not fields:
+            return list(PATIENT_API_DEFAULT_FIELDS)
+        if isinstance(fields, str):
+            fields = fields.split(',')
+        keys = [key.strip() for key in fields if key and key.strip()]
+        unknown = [key for key in keys if key not in PATIENT_API_FIELDS]
+        if unknown:
+            raise ValueError("Unknown fields: %s" % ', '.join(unknown))
+        if 'id' not in keys:
+            keys.insert(0, 'id')
+        return keys
+
+    def _get_patient_domain(self, search=None, state=None, department_id=None, blood_type=None):
+        """Build the search / filter domain of the patient list."""
+        domain = []
+        if search:
+            domain += ['|', '|',
+                       ('first_name', 'ilike', search),
+                       ('last_name', 'ilike', search),
+                       ('email', 'ilike', search)]
+        if state:
+            domain.append(('state', '=', state))
+        if department_id:
+            domain.append(('department_id', '=', int(department_id)))
+        if blood_type:
+            domain.append(('blood_type', '=', blood_type))
+        return domain
+
     @http.route('/hms/patients', type='json', auth='none', csrf=False)
-    def get_patients(self):
+    def get_patients(self, limit=DEFAULT_PAGE_SIZE, cursor=None, fields=None,
+                     search=None, state=None, department_id=None, blood_type=None, ids=None, upto=None):
+        """
+        Keyset paginated patient list.
+
+        :param limit: page size (capped at MAX_PAGE_SIZE).
+        :param cursor: id of the last patient of the previous page.
+        :param upto: id of the last patient of this page, to re-fetch a known page without
+                     spilling into the next one.
+        :param fields: API keys to return; `history` is skipped unless listed.
+        :param search: matched against first name, last name and email.
+        :param state, department_id, blood_type: optional filters.
+        :param ids: only these patients, to fetch given patients by id.
+        :return: {'records': [...], 'next_cursor': id or None}
+        """
         try:
-            patients = request.env['hms.patient'].sudo().search([])
-            if not patients:
-                return {
-                    "message": "There are no records",
-                }
-
-            return [{
-                'id': p.id,
-                'first_name': p.first_name,
-                'last_name': p.last_name,
-                'name': f"{p.first_name} {p.last_name}",
-                'email': p.email,
-                'birth_date': p.birth_date.strftime('%Y-%m-%d') if p.birth_date else None,  # تحويل التاريخ لstring
-                'history': p.history if p.history else '',  # Medical History (HTML)
-                'pcr': p.pcr,  # Boolean
-                'cr_ratio': p.cr_ratio,  # Float
-                'blood_type': p.blood_type,  # Selection
-                'image': p.image if p.image else None,  # الصورة (base64 encoded)
-                'address': p.address if p.address else '',
-                'age': p.age,
-                'department_id': p.department_id.id if p.department_id else None,
-                'department_name': p.department_id.name if p.department_id else 'N/A',  # اسم القسم
-                'department_capacity': p.department_capacity,
-                'doctor_ids': [(doc.id, doc.name) for doc in p.doctor_ids],  # لستة من الأطباء (id, name)
-                'log_history_ids': [(log.id, log.create_date.strftime('%Y-%m-%d %H:%M:%S')) for log in p.log_history_ids],  # لستة من السجلات
-                'state': p.state,
-            } for p in patients]
+            limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+            keys = self._parse_api_fields(fields)
+
+            domain = self._get_patient_domain(search, state, department_id, blood_type)
+            if cursor:
+                domain.append(('id', '>', int(cursor)))
+            if upto:
+                domain.append(('id', '<=', int(upto)))
+            if ids:
+                domain.append(('id', 'in', [int(patient_id) for patient_id in ids]))
+            patients = request.env['hms.patient'].sudo().search(domain, order='id', limit=limit)
+
+            return {
+                'records': patients._serialize_api(keys),
+                'next_cursor': patients[-1].id if len(patients) == limit else None,
+            }
 
         except Exception as error:
             return {
                 "message": str(error),
             }
 
+    def _export_patients(self, db, uid, context, domain, keys):
+        """
+        Yield patients as NDJSON lines, EXPORT_CHUNK_SIZE patients per chunk.
+        Runs on its own cursor since the response is consumed after the request cursor is closed,
+        with the user and context of the request so that access rights and record rules apply.
+        """
+        if 'write_date' not in keys:
+            keys = keys + ['write_date']
+        with Registry(db).cursor() as cr:
+            env = api.Environment(cr, uid, context)
+            last_id = 0
+            while True:
+                patients = env['hms.patient'].search(
+                    domain + [('id', '>', last_id)], order='id', limit=EXPORT_CHUNK_SIZE
+                )
+                if not patients:
+                    break
+                for record in patients._serialize_api(keys):
+                    yield json.dumps(record) + '\n'
+                last_id = patients[-1].id
+                # drop the chunk from the cache to keep memory flat
+                env.invalidate_all()
+
+    @http.route('/hms/patients/export', type='http', auth='user', methods=['GET'])
+    def export_patients(self, since=None, fields=None, **kwargs):
+        """
+        Stream patients as newline-delimited JSON.
+
+        :param since: only patients written at or after this datetime (`YYYY-MM-DD HH:MM:SS`).
+        :param fields: comma separated API keys, same projection as /hms/patients.
+        """
+        try:
+            keys = self._parse_api_fields(fields)
+            domain = [('write_date', '>=', odoo_fields.Datetime.to_datetime(since))] if since else []
+        except ValueError as error:
+            return request.make_json_response({"message": str(error)}, status=400)
+
+        return request.make_response(
+            self._export_patients(request.db, request.env.uid, dict(request.env.context), domain, keys),
+            headers=[('Content-Type', 'application/x-ndjson')],
+        )
+
+    @http.route('/hms/patients/delete', type='json', auth='user', methods=['POST'])
+    def delete_patients(self, ids):
+        """
+        Delete several patients with the access rights of the current user.
+        All patients are deleted with a single `unlink()`; when it fails, they are deleted
+        one by one so that each id gets its own outcome.
+
+        :param ids: patient ids to delete.
+        :return: {'results': {id: {'success': True} or {'error': message}}}
+        """
+        try:
+            ids = [int(patient_id) for patient_id in ids]
+            patients = request.env['hms.patient'].browse(ids).exists()
+            blockers = patients._get_unlink_blockers()
+            to_delete = patients.filtered(lambda p: p.id not in blockers)
+        except Exception as e:
+            return {"error": str(e)}
+
+        results = {patient_id: {"error": "Patient not found."} for patient_id in ids}
+        results.update({patient_id: {"error": reason} for patient_id, reason in blockers.items()})
+        if not to_delete:
+            return {"results": results}
+        try:
+            with request.env.cr.savepoint():
+                to_delete.unlink()
+            results.update({patient_id: {"success": True} for patient_id in to_delete.ids})
+        except Exception:
+            request.env.invalidate_all()
+            for patient in to_delete:
+                try:
+                    with request.env.cr.savepoint():
+                        patient.unlink()
+                    results[patient.id] = {"success": True}
+                except Exception as e:
+                    results[patient.id] = {"error": str(e)}
+        return {"results": results}
 
     @http.route('/hms/patients/<int:patient_id>/delete', type='json', auth='none', csrf=False, methods=['POST'])
     def delete_patient(self, patient_id):
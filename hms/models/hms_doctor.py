@@ -1,11 +1,21 @@
 from odoo import models, fields
 
+from .hms_patient import get_api_image_urls
+
 class Doctor(models.Model):
     _name = "hms.doctor"
     _rec_name= "first_name"
 
     first_name = fields.Char()
     last_name = fields.Char()
-    image = fields.Binary()
+    image = fields.Image()
+    image_128 = fields.Image(related="image", max_width=128, max_height=128, store=True)
+    image_512 = fields.Image(related="image", max_width=512, max_height=512, store=True)
     patient_ids = fields.Many2many("hms.patient",string="Patients")
 
+    def _get_api_image_urls(self):
+        """
+        Image URLs per doctor as {doctor_id: {size: url}}.
+        """
+        return get_api_image_urls(self)
+
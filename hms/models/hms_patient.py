@@ -1,15 +1,81 @@
 from odoo import models, fields,api
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import create_index
+import calendar
 import re
 
+# API keys exposed by the patient API and the model fields each one needs
+PATIENT_API_FIELDS = {
+    'id': ['id'],
+    'first_name': ['first_name'],
+    'last_name': ['last_name'],
+    'name': ['first_name', 'last_name'],
+    'email': ['email'],
+    'birth_date': ['birth_date'],
+    'history': ['history'],
+    'pcr': ['pcr'],
+    'cr_ratio': ['cr_ratio'],
+    'blood_type': ['blood_type'],
+    'image': [],
+    'address': ['address'],
+    'age': ['age'],
+    'department_id': ['department_id'],
+    'department_name': ['department_id'],
+    'department_capacity': ['department_id'],
+    'doctor_ids': [],
+    'log_history_ids': [],
+    'state': ['state'],
+    'write_date': ['write_date'],
+}
+# HTML fields are only sent when explicitly asked for, images are sent as URLs
+PATIENT_API_HEAVY_FIELDS = ('history',)
+EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
+IMPORT_REQUIRED_FIELDS = ('first_name', 'last_name', 'birth_date')
+
+# Indexed birthday expression, used to find the patients whose age changes today
+BIRTHDAY_MONTH_SQL = "(EXTRACT(MONTH FROM birth_date))"
+BIRTHDAY_DAY_SQL = "(EXTRACT(DAY FROM birth_date))"
+AGE_BACKFILL_BATCH_SIZE = 1000
+
+# API size label -> image field, shared by patients and doctors
+API_IMAGE_FIELDS = {'128': 'image_128', '512': 'image_512', 'full': 'image'}
+PATIENT_API_DEFAULT_FIELDS = [key for key in PATIENT_API_FIELDS if key not in PATIENT_API_HEAVY_FIELDS]
+
+
+def get_api_image_urls(records):
+    """
+    Image URLs per record as {record_id: {size: url}}, one query on the attachments.
+    The attachment checksum is used as `unique` so /web/image serves them with a long
+    lived cache and a stable ETag.
+    """
+    image_fields = list(API_IMAGE_FIELDS.values())
+    records.flush_recordset(image_fields)
+    records.env['ir.attachment'].flush_model(['res_model', 'res_field', 'res_id', 'checksum'])
+    records.env.cr.execute("""
+        SELECT res_id, res_field, checksum
+          FROM ir_attachment
+         WHERE res_model = %s AND res_field = ANY(%s) AND res_id = ANY(%s)
+    """, [records._name, image_fields, records.ids])
+    checksums = {(res_id, field): checksum for res_id, field, checksum in records.env.cr.fetchall()}
+
+    urls = {}
+    for record_id in records.ids:
+        sizes = {
+            size: f"/web/image/{records._name}/{record_id}/{field}?unique={checksums[record_id, field]}"
+            for size, field in API_IMAGE_FIELDS.items() if (record_id, field) in checksums
+        }
+        if sizes:
+            urls[record_id] = sizes
+    return urls
+
 class Patient(models.Model):
     _name = 'hms.patient'
     _rec_name = 'first_name'
 
 
-    first_name = fields.Char(string="First Name", required=True)
-    last_name = fields.Char(string="Last Name", required=True)
-    email = fields.Char(string="Email",unique=True)
+    first_name = fields.Char(string="First Name", required=True, index='trigram')
+    last_name = fields.Char(string="Last Name", required=True, index='trigram')
+    email = fields.Char(string="Email",unique=True, index='trigram')
     birth_date = fields.Date(string="Birth Date", required=True)
     history = fields.Html(string="Medical History")
     pcr = fields.Boolean(string="PCR Test")
@@ -19,12 +85,14 @@ class Patient(models.Model):
         ('B+', 'B+'), ('B-', 'B-'),
         ('AB+', 'AB+'), ('AB-', 'AB-'),
         ('O+', 'O+'), ('O-', 'O-')
-    ], string="Blood Type")
+    ], string="Blood Type", index=True)
     image = fields.Image(string="Profile Image")
+    image_512 = fields.Image(string="Profile Image 512", related="image", max_width=512, max_height=512, store=True)
+    image_128 = fields.Image(string="Profile Image 128", related="image", max_width=128, max_height=128, store=True)
     address = fields.Text(string="Address")
     age = fields.Integer(string="Age", compute="_compute_age", store=True)
 
-    department_id = fields.Many2one("hms.department")
+    department_id = fields.Many2one("hms.department", index=True)
     department_capacity = fields.Integer(related='department_id.capacity')
     doctor_ids = fields.Many2many('hms.doctor', string="Doctors")
     log_history_ids = fields.One2many("hms.log.history","patient_log_history_id",string="Log History")
@@ -33,35 +101,137 @@ class Patient(models.Model):
         ('good', 'Good'),
         ('fair', 'Fair'),
         ('serious', 'Serious'),
-    ], default='undetermined')
+    ], default='undetermined', index=True)
 
     _sql_constraints = [
         ('unique_email', 'UNIQUE(email)', 'Your email already exists.')
     ]
 
+    def init(self):
+        # case-insensitive email lookups, used by the CRM uniqueness check
+        create_index(self.env.cr, 'hms_patient_email_lower_index', self._table, ['lower(email)'])
+        # month/day lookups of the daily age update
+        create_index(self.env.cr, 'hms_patient_birthday_index', self._table, [BIRTHDAY_MONTH_SQL, BIRTHDAY_DAY_SQL])
+        # incremental exports (`since`), only the patients written after a date are scanned
+        create_index(self.env.cr, 'hms_patient_write_date_id_index', self._table, ['write_date', 'id'])
+
     @api.constrains('email')
     def _check_email(self):
-        email_regex = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
-        for record in self:
-            if record.email and not re.match(email_regex, record.email):
-                raise ValidationError('Invalid email format: %s' % record.email)
+        """Validate the whole recordset and report every invalid email at once."""
+        invalid_emails = [record.email for record in self if record.email and not EMAIL_REGEX.match(record.email)]
+        if invalid_emails:
+            raise ValidationError('Invalid email format: %s' % ', '.join(invalid_emails))
+
+    @api.model
+    def validate_import_vals(self, vals_list):
+        """
+        Check candidate patient values before importing them, without creating anything.
+        Duplicate emails are looked up with a single query for the whole batch.
+
+        :param vals_list: list of patient values dicts.
+        :return: {row index: [error messages]} for the invalid rows only.
+        """
+        errors = {}
+        emails = {}
+        for index, vals in enumerate(vals_list):
+            row_errors = [f"{name} is required." for name in IMPORT_REQUIRED_FIELDS if not vals.get(name)]
+            email = vals.get('email')
+            if email:
+                if not EMAIL_REGEX.match(email):
+                    row_errors.append(f"Invalid email format: {email}")
+                elif email.lower() in emails:
+                    row_errors.append(f"Email {email} is duplicated in row {emails[email.lower()]}.")
+                else:
+                    emails[email.lower()] = index
+            if row_errors:
+                errors[index] = row_errors
+
+        if emails:
+            self.flush_model(['email'])
+            self.env.cr.execute(
+                f"SELECT lower(email) FROM {self._table} WHERE lower(email) = ANY(%s)", [list(emails)]
+            )
+            for (email,) in self.env.cr.fetchall():
+                errors.setdefault(emails[email], []).append(f"Email {email} already exists.")
+        return errors
 
-    @api.constrains('state')
     def _log_state_change(self):
-        for record in self:
-            record.log_history_ids = [(0, 0, {'description': f"State changed to: {record.state}"})]
+        """
+        Log the current state of every patient of the recordset with one `create(vals_list)`.
+        With `hms_defer_state_log` in the context the rows are buffered and inserted once,
+        right before the transaction commits.
+        """
+        vals_list = [{
+            'patient_log_history_id': record.id,
+            'description': f"State changed to: {record.state}",
+        } for record in self]
+        if not vals_list:
+            return
+        if self.env.context.get('hms_defer_state_log'):
+            pending = self.env.cr.precommit.data.setdefault('hms.patient.state_logs', [])
+            if not pending:
+                self.env.cr.precommit.add(self._flush_state_logs)
+            pending.extend(vals_list)
+        else:
+            self.env['hms.log.history'].create(vals_list)
+
+    def _flush_state_logs(self):
+        """Insert the state logs buffered by `_log_state_change` in deferred mode."""
+        vals_list = self.env.cr.precommit.data.pop('hms.patient.state_logs', [])
+        existing_ids = set(self.browse({vals['patient_log_history_id'] for vals in vals_list}).exists().ids)
+        vals_list = [vals for vals in vals_list if vals['patient_log_history_id'] in existing_ids]
+        if vals_list:
+            self.env['hms.log.history'].create(vals_list)
 
     @api.depends('birth_date')
     def _compute_age(self):
+        # same day as the daily birthday update, which passes it in the context
+        today = self.env.context.get('age_date') or fields.Date.context_today(self)
         for record in self:
             if record.birth_date:
-                today = fields.Date.today()
                 record.age = today.year - record.birth_date.year - (
                     (today.month, today.day) < (record.birth_date.month, record.birth_date.day)
                 )
             else:
                 record.age = 0
 
+    def _recompute_age(self, day=None):
+        """Recompute and store the age of the recordset, as of `day` (today by default)."""
+        patients = self.with_context(age_date=day) if day else self
+        self.env.add_to_compute(self._fields['age'], patients)
+        patients.flush_recordset(['age'])
+
+    @api.model
+    def _get_birthday_patients(self, day):
+        """
+        Patients whose age changes on `day`, found through the month/day index.
+        On March 1st of a non-leap year this includes patients born on February 29th.
+        """
+        dates = [(day.month, day.day)]
+        if day.month == 3 and day.day == 1 and not calendar.isleap(day.year):
+            dates.append((2, 29))
+        where = " OR ".join([f"({BIRTHDAY_MONTH_SQL} = %s AND {BIRTHDAY_DAY_SQL} = %s)"] * len(dates))
+        self.flush_model(['birth_date'])
+        self.env.cr.execute(
+            f"SELECT id FROM {self._table} WHERE {where}",
+            [value for date in dates for value in date],
+        )
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    @api.model
+    def _cron_recompute_birthday_age(self):
+        """Daily job: only patients having their birthday today get a new age."""
+        today = fields.Date.context_today(self)
+        self._get_birthday_patients(today)._recompute_age(today)
+
+    @api.model
+    def _backfill_age(self):
+        """Recompute the age of every patient, AGE_BACKFILL_BATCH_SIZE patients at a time."""
+        patient_ids = self.search([]).ids
+        for start in range(0, len(patient_ids), AGE_BACKFILL_BATCH_SIZE):
+            self.browse(patient_ids[start:start + AGE_BACKFILL_BATCH_SIZE])._recompute_age()
+            self.env.invalidate_all()
+
 
     @api.onchange('age')
     def _on_change_age(self):
@@ -75,3 +245,118 @@ class Patient(models.Model):
             }
         else :
             self.pcr = False
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        patients = super().create(vals_list)
+        patients._log_state_change()
+        return patients
+
+    def write(self, vals):
+        if 'state' not in vals:
+            return super().write(vals)
+        changed = self.filtered(lambda p: p.state != vals['state'])
+        res = super().write(vals)
+        changed._log_state_change()
+        return res
+
+    def _get_unlink_blockers(self):
+        """
+        Patients of the recordset that must not be deleted, as {patient_id: reason}.
+        Meant to be extended by modules linking other records to patients.
+        """
+        return {}
+
+    def _get_api_doctors(self):
+        """Doctors per patient as {patient_id: [(doctor_id, name)]}, one query over the M2M table."""
+        field = self._fields['doctor_ids']
+        self.env['hms.doctor'].flush_model(['first_name'])
+        self.flush_model(['doctor_ids'])
+        self.env.cr.execute(f"""
+            SELECT rel.{field.column1}, doc.id, doc.first_name
+              FROM {field.relation} rel
+              JOIN hms_doctor doc ON doc.id = rel.{field.column2}
+             WHERE rel.{field.column1} = ANY(%s)
+          ORDER BY doc.id
+        """, [self.ids])
+        doctors = {}
+        for patient_id, doctor_id, name in self.env.cr.fetchall():
+            doctors.setdefault(patient_id, []).append((doctor_id, name))
+        return doctors
+
+    def _get_api_log_history(self):
+        """Log history per patient as {patient_id: [(log_id, create_date)]}, one grouped query."""
+        self.env['hms.log.history'].flush_model(['patient_log_history_id'])
+        self.env.cr.execute("""
+            SELECT patient_log_history_id,
+                   array_agg(id ORDER BY id),
+                   array_agg(to_char(create_date, 'YYYY-MM-DD HH24:MI:SS') ORDER BY id)
+              FROM hms_log_history
+             WHERE patient_log_history_id = ANY(%s)
+          GROUP BY patient_log_history_id
+        """, [self.ids])
+        return {
+            patient_id: list(zip(log_ids, dates))
+            for patient_id, log_ids, dates in self.env.cr.fetchall()
+        }
+
+    def _get_api_image_urls(self):
+        """
+        Image URLs per patient as {patient_id: {size: url}}.
+        """
+        return get_api_image_urls(self)
+
+    def _serialize_api(self, keys=None):
+        """
+        Serialize the recordset for the patient API.
+        Each relation is fetched with one query for the whole recordset, so the number of
+        queries does not depend on the number of patients.
+
+        :param keys: API keys to return, see PATIENT_API_FIELDS.
+        :return: list of dicts, in recordset order.
+        """
+        keys = keys or PATIENT_API_DEFAULT_FIELDS
+        if not self:
+            return []
+
+        model_fields = sorted({name for key in keys for name in PATIENT_API_FIELDS[key]} - {'id'})
+        rows = self.read(model_fields, load=None) if model_fields else [{'id': id_} for id_ in self.ids]
+
+        departments = {}
+        if 'department_id' in model_fields:
+            department_ids = {row['department_id'] for row in rows if row['department_id']}
+            departments = {
+                dep['id']: dep
+                for dep in self.env['hms.department'].browse(department_ids).read(['name', 'capacity'])
+            }
+        doctors = self._get_api_doctors() if 'doctor_ids' in keys else {}
+        logs = self._get_api_log_history() if 'log_history_ids' in keys else {}
+        images = self._get_api_image_urls() if 'image' in keys else {}
+
+        result = []
+        for row in rows:
+            department = departments.get(row.get('department_id'), {})
+            values = {
+                'id': row['id'],
+                'first_name': row.get('first_name'),
+                'last_name': row.get('last_name'),
+                'name': f"{row.get('first_name')} {row.get('last_name')}",
+                'email': row.get('email'),
+                'birth_date': row['birth_date'].strftime('%Y-%m-%d') if row.get('birth_date') else None,
+                'history': row.get('history') or '',  # Medical History (HTML)
+                'pcr': row.get('pcr'),
+                'cr_ratio': row.get('cr_ratio'),
+                'blood_type': row.get('blood_type'),
+                'image': images.get(row['id']),  # {'128': url, '512': url, 'full': url}
+                'address': row.get('address') or '',
+                'age': row.get('age'),
+                'department_id': department.get('id'),
+                'department_name': department.get('name', 'N/A'),
+                'department_capacity': department.get('capacity', 0),
+                'doctor_ids': doctors.get(row['id'], []),
+                'log_history_ids': logs.get(row['id'], []),
+                'state': row.get('state'),
+                'write_date': fields.Datetime.to_string(row.get('write_date')),
+            }
+            result.append({key: values[key] for key in keys})
+        return result
@@ -1,42 +1,241 @@
 /** @odoo-module **/
 
-import { Component, useState, onWillStart } from "@odoo/owl";
+import { Component, useState, useRef, onWillStart, onMounted } from "@odoo/owl";
 import { rpc } from "@web/core/network/rpc";
+import { useService } from "@web/core/utils/hooks";
+import { debounce } from "@web/core/utils/timing";
+
+// Virtual scroll layout: cards are laid out in rows of fixed height
+const PAGE_SIZE = 60;
+const COLUMNS = 3;
+const ROW_HEIGHT = 230;
+// Pages kept around the visible ones, anything further is dropped and re-fetched on demand
+const BUFFER_PAGES = 1;
 
 export class OrdersList extends Component {
     static template = "hms.OrdersListTemplate";
 
     setup() {
-        this.state = useState({ patients: [] });
-        this.fetchPatients();
+        this.orm = useService("orm");
+        this.scrollRef = useRef("scroller");
+        this.state = useState({
+            pages: {},          // page index -> patients, only for the window
+            pageSizes: [],      // number of patients of every page fetched so far
+            hasMore: true,
+            scrollTop: 0,
+            viewportHeight: 0,
+            search: "",
+            filters: { state: "", department_id: "", blood_type: "" },
+            departments: [],
+            selectedPatient: null,
+            checkedIds: [],     // patients ticked for bulk deletion
+        });
+        // cursors[k] is the keyset cursor used to fetch page k, cursors[k + 1] bounds it
+        this.cursors = [null];
+        this.loadingPages = new Set();
+        this.generation = 0;
+        this.debouncedReload = debounce(() => this.reload(), 300);
+
+        onWillStart(async () => {
+            this.state.departments = await this.orm.searchRead("hms.department", [], ["name"]);
+            await this.loadPage(0);
+        });
+        onMounted(() => {
+            this.state.viewportHeight = this.scrollRef.el.clientHeight;
+        });
+    }
+
+    // ==========================
+    // LAYOUT
+    // ==========================
+    pageHeight(index) {
+        return Math.ceil((this.state.pageSizes[index] || 0) / COLUMNS) * ROW_HEIGHT;
+    }
+
+    pageOffset(index) {
+        let offset = 0;
+        for (let i = 0; i < index; i++) {
+            offset += this.pageHeight(i);
+        }
+        return offset;
+    }
+
+    get totalHeight() {
+        return this.pageOffset(this.state.pageSizes.length);
     }
 
-    async fetchPatients() {
+    get windowRange() {
+        const { scrollTop, viewportHeight, pageSizes } = this.state;
+        let first = 0;
+        let offset = 0;
+        while (first < pageSizes.length - 1 && offset + this.pageHeight(first) <= scrollTop) {
+            offset += this.pageHeight(first);
+            first++;
+        }
+        let last = first;
+        while (last < pageSizes.length - 1 && offset + this.pageHeight(last) < scrollTop + viewportHeight) {
+            offset += this.pageHeight(last);
+            last++;
+        }
+        return {
+            first: Math.max(0, first - BUFFER_PAGES),
+            last: Math.min(pageSizes.length - 1, last + BUFFER_PAGES),
+        };
+    }
+
+    get windowPages() {
+        const { first, last } = this.windowRange;
+        const pages = [];
+        for (let index = first; index <= last; index++) {
+            pages.push({ index, height: this.pageHeight(index), patients: this.state.pages[index] });
+        }
+        return pages;
+    }
+
+    get topSpacer() {
+        return this.pageOffset(this.windowRange.first);
+    }
+
+    get bottomSpacer() {
+        return this.totalHeight - this.pageOffset(this.windowRange.last + 1);
+    }
+
+    // ==========================
+    // DATA
+    // ==========================
+    async loadPage(index) {
+        if (this.loadingPages.has(index)) return;
+        this.loadingPages.add(index);
+        const generation = this.generation;
         try {
-            const data = await rpc('/hms/patients');
-            this.state.patients = data;
+            const data = await rpc('/hms/patients', {
+                cursor: this.cursors[index],
+                // a known page stops at the next cursor, deleted rows must not pull in the next page
+                upto: this.cursors[index + 1],
+                limit: PAGE_SIZE,
+                search: this.state.search,
+                ...this.state.filters,
+            });
+            if (generation !== this.generation) return;
+            this.state.pages[index] = data.records;
+            this.state.pageSizes[index] = data.records.length;
+            if (index === this.cursors.length - 1) {
+                this.cursors.push(data.next_cursor);
+                this.state.hasMore = Boolean(data.next_cursor);
+            }
         } catch (error) {
             console.error("Error fetching patients:", error);
+        } finally {
+            this.loadingPages.delete(index);
+        }
+    }
+
+    syncWindow() {
+        const { first, last } = this.windowRange;
+        for (const index of Object.keys(this.state.pages).map(Number)) {
+            if (index < first || index > last) {
+                delete this.state.pages[index];
+            }
         }
+        for (let index = first; index <= last; index++) {
+            if (!this.state.pages[index]) {
+                this.loadPage(index);
+            }
+        }
+        const nearBottom = this.state.scrollTop + 2 * this.state.viewportHeight >= this.totalHeight;
+        if (this.state.hasMore && nearBottom) {
+            this.loadPage(this.cursors.length - 1);
+        }
+    }
+
+    async reload() {
+        this.generation++;
+        this.cursors = [null];
+        this.loadingPages.clear();
+        Object.assign(this.state, { pages: {}, pageSizes: [], hasMore: true, scrollTop: 0 });
+        if (this.scrollRef.el) {
+            this.scrollRef.el.scrollTop = 0;
+        }
+        await this.loadPage(0);
+    }
+
+    // ==========================
+    // HANDLERS
+    // ==========================
+    onScroll(ev) {
+        this.state.scrollTop = ev.target.scrollTop;
+        this.state.viewportHeight = ev.target.clientHeight;
+        this.syncWindow();
+    }
+
+    onSearchInput(ev) {
+        this.state.search = ev.target.value;
+        this.debouncedReload();
     }
 
-    viewPatient(id) {
-        const patient = this.state.patients.find(p => p.id === id);
+    onFilterChange(name, ev) {
+        this.state.filters[name] = ev.target.value;
+        this.reload();
+    }
+
+    findPatient(id) {
+        for (const patients of Object.values(this.state.pages)) {
+            const patient = patients.find(p => p.id === id);
+            if (patient) return patient;
+        }
+    }
+
+    async viewPatient(id) {
+        const patient = this.findPatient(id);
         if (patient) {
-            this.state.selectedPatient = patient;
+            // history is not part of the list payload, load it for this patient only
+            const data = await rpc('/hms/patients', { ids: [id], fields: ['history'] });
+            const record = (data.records || []).find(r => r.id === id);
+            if (!record) {
+                alert("This patient is no longer available.");
+                return;
+            }
+            this.state.selectedPatient = Object.assign({}, patient, record);
             const modal = new bootstrap.Modal(document.getElementById('patientModal'));
             modal.show();
         }
     }
 
-    async deletePatient(id) {
-        if (!confirm("Are you sure you want to delete this patient?")) return;
+    toggleChecked(id) {
+        const checkedIds = this.state.checkedIds;
+        this.state.checkedIds = checkedIds.includes(id) ? checkedIds.filter(i => i !== id) : [...checkedIds, id];
+    }
 
+    async deletePatients(ids) {
         try {
-            await rpc(`/hms/patients/${id}/delete`, { method: 'POST' });
-            this.state.patients = this.state.patients.filter(p => p.id !== id);
+            const data = await rpc('/hms/patients/delete', { ids });
+            if (data.error) {
+                console.error("Delete error:", data.error);
+                return;
+            }
+            const deleted = ids.filter(id => data.results[id] && data.results[id].success);
+            const errors = ids.filter(id => data.results[id] && data.results[id].error).map(id => data.results[id].error);
+            for (const [index, patients] of Object.entries(this.state.pages)) {
+                this.state.pages[index] = patients.filter(p => !deleted.includes(p.id));
+                this.state.pageSizes[index] = this.state.pages[index].length;
+            }
+            this.state.checkedIds = this.state.checkedIds.filter(id => !deleted.includes(id));
+            if (errors.length) {
+                alert(errors.join("\n"));
+            }
         } catch (error) {
             console.error("Delete error:", error);
         }
     }
+
+    async deletePatient(id) {
+        if (!confirm("Are you sure you want to delete this patient?")) return;
+        await this.deletePatients([id]);
+    }
+
+    async deleteCheckedPatients() {
+        const ids = this.state.checkedIds;
+        if (!ids.length || !confirm(`Are you sure you want to delete ${ids.length} patients?`)) return;
+        await this.deletePatients(ids);
+    }
 }
@@ -0,0 +1,5 @@
+from . import test_patient_api
+from . import test_patient_serializer
+from . import test_patient_state_log
+from . import test_patient_age
+from . import test_patient_import
@@ -0,0 +1,76 @@
+from datetime import date
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+
+class TestPatientAge(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        today = fields.Date.context_today(self.env['hms.patient'])
+        # a leap year when today is February 29th
+        self.years = 28 if (today.month, today.day) == (2, 29) else 30
+        self.birthday_patient = self.env['hms.patient'].create({
+            'first_name': 'Birthday',
+            'last_name': 'Test',
+            'birth_date': today.replace(year=today.year - self.years),
+        })
+        self.other_patient = self.env['hms.patient'].create({
+            'first_name': 'Other',
+            'last_name': 'Test',
+            'birth_date': date(1990, 1, 1) if (today.month, today.day) != (1, 1) else date(1990, 6, 1),
+        })
+        # simulate ages stored a year ago
+        self.env.flush_all()
+        self.env.cr.execute("UPDATE hms_patient SET age = 0 WHERE id IN %s",
+                            [(self.birthday_patient.id, self.other_patient.id)])
+        self.env.invalidate_all()
+
+    def test_cron_only_updates_birthdays(self):
+        """
+        Test that the daily job only recomputes patients having their birthday today.
+        """
+        self.env['hms.patient']._cron_recompute_birthday_age()
+        self.env.invalidate_all()
+
+        self.assertEqual(self.birthday_patient.age, self.years)
+        self.assertEqual(self.other_patient.age, 0)
+
+    def test_leap_day_birthday(self):
+        """
+        Test that patients born on February 29th get their new age on March 1st of non-leap years.
+        """
+        Patient = self.env['hms.patient']
+        leap_patient, eve_patient = Patient.create([
+            {'first_name': 'Leap', 'last_name': 'Test', 'birth_date': date(2000, 2, 29)},
+            {'first_name': 'Eve', 'last_name': 'Test', 'birth_date': date(2000, 2, 28)},
+        ])
+        patients = Patient._get_birthday_patients(date(2023, 3, 1))
+        self.assertIn(leap_patient, patients)
+        self.assertNotIn(eve_patient, patients)
+        self.assertIn(eve_patient, Patient._get_birthday_patients(date(2023, 2, 28)))
+        self.assertNotIn(leap_patient, Patient._get_birthday_patients(date(2024, 3, 1)))
+        self.assertIn(leap_patient, Patient._get_birthday_patients(date(2024, 2, 29)))
+
+        leap_patient._recompute_age(date(2023, 3, 1))
+        self.assertEqual(leap_patient.age, 23)
+
+    def test_age_as_of_day(self):
+        """
+        Test that the age is computed for the day given by the daily update, not the server date.
+        """
+        self.birthday_patient.birth_date = date(1990, 6, 15)
+        self.birthday_patient._recompute_age(date(2020, 6, 14))
+        self.assertEqual(self.birthday_patient.age, 29)
+        self.birthday_patient._recompute_age(date(2020, 6, 15))
+        self.assertEqual(self.birthday_patient.age, 30)
+
+    def test_backfill(self):
+        """
+        Test that the backfill recomputes every patient.
+        """
+        self.env['hms.patient']._backfill_age()
+        self.env.invalidate_all()
+        self.assertEqual(self.birthday_patient.age, self.years)
+        self.assertNotEqual(self.other_patient.age, 0)
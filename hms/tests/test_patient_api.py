@@ -0,0 +1,188 @@
+import json
+import time
+
+from odoo.tests import HttpCase, tagged
+
+
+class TestPatientApi(HttpCase):
+
+    def setUp(self):
+        super().setUp()
+        self.department = self.env['hms.department'].create({'name': 'Cardiology', 'capacity': 10})
+        self.doctor = self.env['hms.doctor'].create({'first_name': 'Sara', 'last_name': 'Ali'})
+        self.patients = self.env['hms.patient'].create([{
+            'first_name': f'Patient {i}',
+            'last_name': 'Test',
+            'birth_date': '1990-01-01',
+            'history': '<p>History</p>',
+            'department_id': self.department.id,
+            'doctor_ids': [(6, 0, [self.doctor.id])],
+        } for i in range(5)])
+
+    def _get_patients(self, **params):
+        return self.make_jsonrpc_request('/hms/patients', params)
+
+    def test_keyset_pagination(self):
+        """
+        Test that walking the cursor returns every patient exactly once.
+        """
+        seen = []
+        cursor = self.patients[0].id - 1
+        while cursor:
+            page = self._get_patients(cursor=cursor, limit=2)
+            seen += [row['id'] for row in page['records'] if row['id'] in self.patients.ids]
+            cursor = page['next_cursor']
+        self.assertEqual(seen, self.patients.ids)
+
+    def test_page_bounded_by_next_cursor(self):
+        """
+        Test that re-fetching a page with deleted patients doesn't pull in the next page.
+        """
+        cursor = self.patients[0].id - 1
+        first_page = self._get_patients(cursor=cursor, limit=2)
+        upto = first_page['next_cursor']
+        self.patients[0].unlink()
+
+        ids = [row['id'] for row in self._get_patients(cursor=cursor, upto=upto, limit=2)['records']]
+        self.assertEqual(ids, self.patients[1:2].ids)
+
+    def test_heavy_fields_skipped_by_default(self):
+        """
+        Test that history is only returned when requested.
+        """
+        row = self._get_patients(limit=1)['records'][0]
+        self.assertNotIn('history', row)
+
+        row = self._get_patients(cursor=self.patients[0].id - 1, limit=1, fields=['history'])['records'][0]
+        self.assertEqual(set(row), {'id', 'history'})
+        self.assertEqual(row['history'], '<p>History</p>')
+
+    def test_fetch_by_ids(self):
+        """
+        Test that patients are fetched by id, and that a deleted one is not replaced by the next one.
+        """
+        target, following = self.patients[1:3]
+        rows = self._get_patients(ids=[target.id], fields=['history'])['records']
+        self.assertEqual(rows, [{'id': target.id, 'history': '<p>History</p>'}])
+
+        target.unlink()
+        self.assertEqual(self._get_patients(ids=[target.id], fields=['history'])['records'], [])
+        self.assertTrue(following.exists())
+
+    def test_relations_serialized(self):
+        """
+        Test department and doctor values of the payload.
+        """
+        row = self._get_patients(cursor=self.patients[0].id - 1, limit=1)['records'][0]
+        self.assertEqual(row['department_name'], 'Cardiology')
+        self.assertEqual(row['doctor_ids'], [[self.doctor.id, 'Sara']])
+
+    def test_search_and_filters(self):
+        """
+        Test that search and filters are applied on the server.
+        """
+        self.patients[0].write({'blood_type': 'O-', 'state': 'serious'})
+        ids = [row['id'] for row in self._get_patients(blood_type='O-', state='serious')['records']]
+        self.assertEqual(ids, self.patients[0].ids)
+
+        ids = [row['id'] for row in self._get_patients(search='Patient 3', department_id=self.department.id)['records']]
+        self.assertEqual(ids, self.patients[3].ids)
+
+    def test_bulk_delete(self):
+        """
+        Test per-id outcomes of the bulk delete route.
+        """
+        self.authenticate('admin', 'admin')
+        to_delete = self.patients[:3]
+        missing_id = self.patients[-1].id + 1000
+        response = self.make_jsonrpc_request('/hms/patients/delete', {'ids': to_delete.ids + [missing_id]})
+
+        for patient_id in to_delete.ids:
+            self.assertEqual(response['results'][str(patient_id)], {'success': True})
+        self.assertEqual(response['results'][str(missing_id)], {'error': 'Patient not found.'})
+        self.assertFalse(to_delete.exists())
+
+    def test_bulk_delete_requires_login(self):
+        """
+        Test that anonymous requests can't delete patients.
+        """
+        response = self.url_open(
+            '/hms/patients/delete',
+            data=json.dumps({'jsonrpc': '2.0', 'method': 'call', 'params': {'ids': self.patients.ids}}),
+            headers={'Content-Type': 'application/json'},
+        )
+        self.assertIn('error', response.json())
+        self.assertEqual(len(self.patients.exists()), 5)
+
+    def test_unknown_field(self):
+        self.assertIn('message', self._get_patients(fields='id,unknown'))
+
+    def test_export_ndjson(self):
+        """
+        Test that the export streams one JSON document per line and honours `since`.
+        """
+        self.authenticate('admin', 'admin')
+        response = self.url_open('/hms/patients/export?fields=id,name,doctor_ids')
+        self.assertEqual(response.headers['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        exported = {row['id']: row for row in rows}
+        for patient in self.patients:
+            self.assertEqual(exported[patient.id]['name'], f'{patient.first_name} Test')
+            self.assertEqual(exported[patient.id]['doctor_ids'], [[self.doctor.id, 'Sara']])
+            self.assertIn('write_date', exported[patient.id])
+
+        response = self.url_open('/hms/patients/export?since=2999-01-01 00:00:00')
+        self.assertEqual(response.text, '')
+
+    def test_export_requires_login(self):
+        """
+        Test that anonymous requests are redirected to the login page instead of exporting patients.
+        """
+        response = self.url_open('/hms/patients/export', allow_redirects=False)
+        self.assertNotEqual(response.headers.get('Content-Type'), 'application/x-ndjson')
+        self.assertIn('/web/login', response.headers.get('Location', ''))
+
+
+@tagged('-standard', 'hms_benchmark')
+class TestPatientApiBenchmark(HttpCase):
+
+    def _time_first_page(self, runs=5):
+        start = time.perf_counter()
+        for _ in range(runs):
+            self.make_jsonrpc_request('/hms/patients', {'limit': 80})
+        return (time.perf_counter() - start) / runs
+
+    def test_page_latency_is_flat(self):
+        """
+        Page latency should not grow with the number of patients.
+        """
+        Patient = self.env['hms.patient']
+        Patient.create([{'first_name': f'P{i}', 'last_name': 'B', 'birth_date': '1990-01-01'} for i in range(200)])
+        small = self._time_first_page()
+
+        Patient.create([{'first_name': f'P{i}', 'last_name': 'B', 'birth_date': '1990-01-01'} for i in range(5000)])
+        large = self._time_first_page()
+
+        self.assertLess(large, small * 3, f"page latency grew from {small:.4f}s to {large:.4f}s")
+
+    def test_bulk_delete_vs_single_calls(self):
+        """
+        Compare one bulk delete call with one call per patient.
+        """
+        Patient = self.env['hms.patient']
+        vals = [{'first_name': f'P{i}', 'last_name': 'B', 'birth_date': '1990-01-01'} for i in range(200)]
+
+        patients = Patient.create(vals)
+        start = time.perf_counter()
+        for patient in patients:
+            self.make_jsonrpc_request(f'/hms/patients/{patient.id}/delete', {})
+        single = time.perf_counter() - start
+
+        patients = Patient.create(vals)
+        self.authenticate('admin', 'admin')
+        start = time.perf_counter()
+        self.make_jsonrpc_request('/hms/patients/delete', {'ids': patients.ids})
+        bulk = time.perf_counter() - start
+
+        self.assertFalse(patients.exists())
+        self.assertLess(bulk, single, f"bulk delete took {bulk:.3f}s, single calls {single:.3f}s")
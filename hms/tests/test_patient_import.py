@@ -0,0 +1,47 @@
+from odoo.exceptions import ValidationError
+from odoo.tests.common import TransactionCase
+
+
+class TestPatientImport(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.Patient = self.env['hms.patient']
+        self.Patient.create({
+            'first_name': 'Existing',
+            'last_name': 'Patient',
+            'birth_date': '1990-01-01',
+            'email': 'existing@hms.com',
+        })
+
+    def test_invalid_emails_reported_together(self):
+        """
+        Test that every invalid email of a batch is reported in one error.
+        """
+        with self.assertRaises(ValidationError) as error:
+            self.Patient.create([{
+                'first_name': f'Patient {i}',
+                'last_name': 'Test',
+                'birth_date': '1990-01-01',
+                'email': email,
+            } for i, email in enumerate(['bad-1', 'good@hms.com', 'bad-2'])])
+        self.assertIn('bad-1', str(error.exception))
+        self.assertIn('bad-2', str(error.exception))
+
+    def test_validate_import_vals(self):
+        """
+        Test the pre-import validation of candidate rows.
+        """
+        count = self.Patient.search_count([])
+        errors = self.Patient.validate_import_vals([
+            {'first_name': 'A', 'last_name': 'A', 'birth_date': '1990-01-01', 'email': 'a@hms.com'},
+            {'first_name': 'B', 'last_name': 'B', 'birth_date': '1990-01-01', 'email': 'not-an-email'},
+            {'first_name': 'C', 'birth_date': '1990-01-01', 'email': 'A@hms.com'},
+            {'first_name': 'D', 'last_name': 'D', 'birth_date': '1990-01-01', 'email': 'Existing@hms.com'},
+        ])
+
+        self.assertEqual(set(errors), {1, 2, 3})
+        self.assertIn('Invalid email format: not-an-email', errors[1])
+        self.assertEqual(len(errors[2]), 2)
+        self.assertEqual(errors[3], ['Email existing@hms.com already exists.'])
+        self.assertEqual(self.Patient.search_count([]), count)
@@ -0,0 +1,78 @@
+from odoo.tests.common import TransactionCase
+
+
+class TestPatientSerializer(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.department = self.env['hms.department'].create({'name': 'Cardiology', 'capacity': 10})
+        self.doctors = self.env['hms.doctor'].create([
+            {'first_name': 'Sara', 'last_name': 'Ali'},
+            {'first_name': 'Omar', 'last_name': 'Adel'},
+        ])
+
+    def _create_patients(self, count):
+        return self.env['hms.patient'].create([{
+            'first_name': f'Patient {i}',
+            'last_name': 'Test',
+            'birth_date': '1990-01-01',
+            'department_id': self.department.id,
+            'doctor_ids': [(6, 0, self.doctors.ids)],
+        } for i in range(count)])
+
+    def _count_queries(self, patients):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        start = self.env.cr.sql_log_count
+        patients._serialize_api()
+        return self.env.cr.sql_log_count - start
+
+    def test_serialized_values(self):
+        """
+        Test department, doctor and log history values of the payload.
+        """
+        patient = self._create_patients(1)
+        values = patient._serialize_api()[0]
+
+        self.assertEqual(values['name'], 'Patient 0 Test')
+        self.assertEqual(values['department_name'], 'Cardiology')
+        self.assertEqual(values['department_capacity'], 10)
+        self.assertEqual(values['doctor_ids'], [(doc.id, doc.first_name) for doc in self.doctors])
+        self.assertEqual([log[0] for log in values['log_history_ids']], patient.log_history_ids.ids)
+        self.assertIsNone(values['image'])
+        self.assertNotIn('history', values)
+
+    def test_image_urls(self):
+        """
+        Test that images are returned as cacheable URLs for each size variant.
+        """
+        # 1x1 PNG
+        png = b'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=='
+        patient = self._create_patients(1)
+        patient.image = png
+
+        urls = patient._serialize_api(['image'])[0]['image']
+        self.assertEqual(set(urls), {'128', '512', 'full'})
+        self.assertTrue(urls['128'].startswith(f'/web/image/hms.patient/{patient.id}/image_128?unique='))
+
+    def test_doctor_image_urls(self):
+        """
+        Test that doctor images are served as cacheable URLs for each size variant.
+        """
+        # 1x1 PNG
+        png = b'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=='
+        doctor = self.doctors[0]
+        doctor.image = png
+
+        urls = self.doctors._get_api_image_urls()
+        self.assertEqual(list(urls), [doctor.id])
+        self.assertEqual(set(urls[doctor.id]), {'128', '512', 'full'})
+        self.assertTrue(urls[doctor.id]['512'].startswith(f'/web/image/hms.doctor/{doctor.id}/image_512?unique='))
+
+    def test_constant_query_count(self):
+        """
+        Test that serializing a page runs the same number of queries whatever its size.
+        """
+        small = self._count_queries(self._create_patients(2))
+        large = self._count_queries(self._create_patients(40))
+        self.assertEqual(small, large, "Patient serialization should not issue queries per record")
@@ -0,0 +1,56 @@
+from odoo.tests.common import TransactionCase
+
+
+class TestPatientStateLog(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.patients = self.env['hms.patient'].create([{
+            'first_name': f'Patient {i}',
+            'last_name': 'Test',
+            'birth_date': '1990-01-01',
+        } for i in range(3)])
+
+    def test_state_change_logged(self):
+        """
+        Test that a state write logs one row per patient whose state changed.
+        """
+        self.patients[0].state = 'good'
+        self.patients.write({'state': 'good'})
+
+        for patient in self.patients:
+            descriptions = patient.log_history_ids.mapped('description')
+            self.assertEqual(descriptions, ["State changed to: undetermined", "State changed to: good"])
+
+    def _count_write_queries(self, patients, state):
+        self.env.flush_all()
+        start = self.env.cr.sql_log_count
+        patients.write({'state': state})
+        self.env.flush_all()
+        return self.env.cr.sql_log_count - start
+
+    def test_state_change_log_batched(self):
+        """
+        Test that a bulk state write doesn't issue queries per patient.
+        """
+        more_patients = self.env['hms.patient'].create([{
+            'first_name': f'Patient {i}',
+            'last_name': 'Other',
+            'birth_date': '1990-01-01',
+        } for i in range(30)])
+        self.assertEqual(
+            self._count_write_queries(self.patients, 'serious'),
+            self._count_write_queries(more_patients, 'serious'),
+        )
+
+    def test_deferred_state_log(self):
+        """
+        Test that deferred logs are only inserted when the transaction commits.
+        """
+        Log = self.env['hms.log.history']
+        before = Log.search_count([('patient_log_history_id', 'in', self.patients.ids)])
+        self.patients.with_context(hms_defer_state_log=True).write({'state': 'fair'})
+        self.assertEqual(Log.search_count([('patient_log_history_id', 'in', self.patients.ids)]), before)
+
+        self.env.cr.precommit.run()
+        self.assertEqual(Log.search_count([('patient_log_history_id', 'in', self.patients.ids)]), before + 3)
@@ -1,7 +1,7 @@
 {
     "name" : "HMS CRM",
     "summary": "Modify CRM module",
-    "depends":["crm"],
+    "depends":["crm", "hms"],
     "data":[
         "views/crm_views.xml"
     ]
@@ -4,19 +4,57 @@ from odoo.exceptions import ValidationError
 class CrmPatientInherit(models.Model):
     _inherit = 'res.partner'
 
-    related_patient_id = fields.Many2one('hms.patient', string="Related Patient")
+    related_patient_id = fields.Many2one('hms.patient', string="Related Patient", index=True)
 
 
     @api.constrains('email')
     def _check_email_uniqueness_with_patients(self):
-        for record in self:
-            if record.email:
-                existing_patient = self.env['hms.patient'].search([('email', '=', record.email)], limit=1)
-                if existing_patient:
-                    raise ValidationError("This email is already associated with a patient and cannot be used for a customer.")
+        """
+        Check every email of the recordset against the patients with a single query,
+        matched case-insensitively on the `lower(email)` index of hms_patient.
+        """
+        emails = {record.email.strip().lower() for record in self if record.email}
+        if not emails:
+            return
+        self.env['hms.patient'].flush_model(['email'])
+        self.env.cr.execute(
+            "SELECT DISTINCT lower(email) FROM hms_patient WHERE lower(email) = ANY(%s)",
+            [list(emails)],
+        )
+        used_emails = [row[0] for row in self.env.cr.fetchall()]
+        if used_emails:
+            raise ValidationError(
+                "This email is already associated with a patient and cannot be used for a customer: %s"
+                % ', '.join(sorted(used_emails))
+            )
 
     def unlink(self):
         for rec in self:
             if rec.related_patient_id:
                 raise ValidationError("You can't delete a customer that is linked to a patient.")
         return super(CrmPatientInherit, self).unlink()
+
+
+class PatientCrmInherit(models.Model):
+    _inherit = 'hms.patient'
+
+    def _get_unlink_blockers(self):
+        """
+        Patients linked to a customer can't be deleted, the customers are looked up
+        with a single query for the whole recordset.
+        """
+        blockers = super(PatientCrmInherit, self)._get_unlink_blockers()
+        partners = self.env['res.partner'].sudo().search_read(
+            [('related_patient_id', 'in', self.ids)], ['related_patient_id', 'display_name']
+        )
+        for partner in partners:
+            blockers[partner['related_patient_id'][0]] = (
+                "You can't delete a patient that is linked to the customer %s." % partner['display_name']
+            )
+        return blockers
+
+    def unlink(self):
+        blockers = self._get_unlink_blockers()
+        if blockers:
+            raise ValidationError('\n'.join(blockers.values()))
+        return super(PatientCrmInherit, self).unlink()
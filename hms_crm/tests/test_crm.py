@@ -0,0 +1,101 @@
+import time
+
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+class TestCrmPatient(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.patients = self.env['hms.patient'].create([{
+            'first_name': f'Patient {i}',
+            'last_name': 'Test',
+            'birth_date': '1990-01-01',
+            'email': f'patient{i}@hms.com',
+        } for i in range(3)])
+        self.partner = self.env['res.partner'].create({
+            'name': 'Linked Customer',
+            'related_patient_id': self.patients[0].id,
+        })
+
+    def test_unlink_blockers(self):
+        """
+        Test that patients linked to a customer are reported as not deletable.
+        """
+        blockers = self.patients._get_unlink_blockers()
+        self.assertEqual(list(blockers), self.patients[0].ids)
+
+    def test_unlink_linked_patient(self):
+        """
+        Test that a plain unlink refuses patients linked to a customer.
+        """
+        with self.assertRaises(ValidationError):
+            self.patients.unlink()
+        self.assertEqual(len(self.patients.exists()), 3)
+
+        self.patients[1:].unlink()
+        self.assertEqual(self.patients.exists(), self.patients[0])
+
+    def test_email_used_by_patient(self):
+        """
+        Test that a customer can't reuse a patient email, whatever its case.
+        """
+        with self.assertRaises(ValidationError):
+            self.env['res.partner'].create([
+                {'name': 'Customer 1', 'email': 'customer1@hms.com'},
+                {'name': 'Customer 2', 'email': 'Patient1@HMS.com'},
+            ])
+
+    def test_email_check_query_count(self):
+        """
+        Test that the email check runs the same number of queries for any batch size.
+        """
+        counts = []
+        for size in (2, 50):
+            partners = self.env['res.partner'].create([
+                {'name': f'Customer {i}', 'email': f'customer{size}_{i}@hms.com'} for i in range(size)
+            ])
+            self.env.flush_all()
+            start = self.env.cr.sql_log_count
+            partners._check_email_uniqueness_with_patients()
+            counts.append(self.env.cr.sql_log_count - start)
+        self.assertEqual(counts[0], counts[1])
+
+
+@tagged('-standard', 'hms_benchmark')
+class TestCrmPatientBenchmark(TransactionCase):
+
+    def test_bulk_import_customers(self):
+        """
+        Import 5k customers in one create, the email check should stay a single query
+        and beat one patient search per customer on the same data.
+        """
+        self.env['hms.patient'].create([{
+            'first_name': f'Patient {i}',
+            'last_name': 'Test',
+            'birth_date': '1990-01-01',
+            'email': f'patient{i}@hms.com',
+        } for i in range(1000)])
+
+        start = time.perf_counter()
+        partners = self.env['res.partner'].create([
+            {'name': f'Customer {i}', 'email': f'customer{i}@hms.com'} for i in range(5000)
+        ])
+        self.env.flush_all()
+        duration = time.perf_counter() - start
+        self.assertLess(duration, 60, f"importing 5000 customers took {duration:.2f}s")
+
+        # previous implementation: one patient search per customer
+        start = time.perf_counter()
+        for partner in partners:
+            self.env['hms.patient'].search([('email', '=', partner.email)], limit=1)
+        search_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        partners._check_email_uniqueness_with_patients()
+        query_duration = time.perf_counter() - start
+
+        self.assertLess(query_duration, search_duration,
+                        f"single query {query_duration:.2f}s vs one search per customer {search_duration:.2f}s")
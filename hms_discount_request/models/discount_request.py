@@ -148,11 +148,10 @@ class DiscountRequest(models.Model):
     # ==========================
     # OVERRIDES
     # ==========================
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """
         Generates a sequence number for 'name' if not set.
         """
-        if vals.get('name', 'New') == 'New':
-            vals['name'] = self.env['ir.sequence'].next_by_code('hms.discount.request') or 'New'
-        return super().create(vals)
+        self.env['ir.sequence']._assign_batch_names(vals_list, 'hms.discount.request')
+        return super().create(vals_list)
@@ -2,7 +2,8 @@
     'name': 'Hospital - Insurance Management',
     'version': '1.0',
     'summary': 'Manage insurance companies and auto-pay patient invoices',
-    'depends': ['hms_base','base', 'account'],
+    # hms_invoicing provides ir.sequence._assign_batch_names(), used to number claims in batches
+    'depends': ['hms_base','base', 'account', 'hms_invoicing'],
     'data': [
         'security/security.xml',
         'security/ir.model.access.csv',
@@ -231,12 +231,11 @@ class InsuranceClaim(models.Model):
     # ==========================
     # OVERRIDES
     # ==========================
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """
         Overrides the default create method to generate a sequence number for 'name'
         if it's not provided or is 'New'.
         """
-        if vals.get('name', 'New') == 'New':
-            vals['name'] = self.env['ir.sequence'].next_by_code('insurance.claim') or 'New'
-        return super().create(vals)
+        self.env['ir.sequence']._assign_batch_names(vals_list, 'insurance.claim')
+        return super().create(vals_list)
@@ -4,6 +4,9 @@
     'summary': 'Create patient invoices and add lines',
     'depends': ['hms_base','account', 'hms_patient'],
     'data': [
+        'security/ir.model.access.csv',
+        'data/hms_charge_cron.xml',
+        'views/hms_charge_views.xml',
         'views/actions.xml',
         'views/menus.xml'
     ],
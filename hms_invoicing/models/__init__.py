@@ -1,2 +1,5 @@
 from . import invoice_service
-from . import account_move
\ No newline at end of file
+from . import account_move
+from . import ir_sequence
+from . import patient
+from . import hms_charge
\ No newline at end of file
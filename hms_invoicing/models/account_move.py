@@ -1,30 +1,53 @@
 from odoo import models, fields, api
+from odoo.tools.sql import create_index
 
 class AccountMove(models.Model):
     _inherit = 'account.move'
+    _rec_names_search = ['name', 'partner_id.name', 'ref', 'patient_id.name']
 
-    patient_id = fields.Many2one('patient', string="Patient", ondelete='restrict')
+    # state labels of the display name, built once per registry
+    _hms_state_labels = None
+
+    patient_id = fields.Many2one('patient', string="Patient", ondelete='restrict', index='btree_not_null')
+
+    def init(self):
+        super().init()
+        # draft customer invoice lookup of a partner, see invoice.service
+        create_index(
+            self.env.cr, 'account_move_draft_out_invoice_partner_index', self._table, ['partner_id'],
+            where="state = 'draft' AND move_type = 'out_invoice'",
+        )
 
     @api.model_create_multi
     def create(self, vals_list):
         """
         Ensure invoices linked to a patient are also linked to the
         patient's related partner (via patient.user_id.partner_id).
+        The partners of the whole batch are resolved at once.
         """
-        for vals in vals_list:
-            patient_id = vals.get('patient_id')
-            if patient_id and not vals.get('partner_id'):
-                patient = self.env['patient'].browse(patient_id)
-                if patient.exists() and patient.user_id.partner_id:
-                    vals['partner_id'] = patient.user_id.partner_id.id
+        patient_ids = {vals['patient_id'] for vals in vals_list if vals.get('patient_id') and not vals.get('partner_id')}
+        if patient_ids:
+            partners = self.env['patient']._get_invoice_partners(patient_ids)
+            for vals in vals_list:
+                if not vals.get('partner_id') and partners.get(vals.get('patient_id')):
+                    vals['partner_id'] = partners[vals['patient_id']]
         return super().create(vals_list)
 
+    @api.model
+    def _get_state_labels(self):
+        """State selection labels, cached on the model class."""
+        cls = type(self)
+        if cls._hms_state_labels is None:
+            cls._hms_state_labels = dict(self._fields['state'].selection)
+        return cls._hms_state_labels
+
     @api.depends('patient_id.name', 'name', 'amount_total', 'state', 'currency_id')
     def _compute_display_name(self):
+        state_labels = self._get_state_labels()
         for rec in self:
             parts = [
                 rec.patient_id.name or rec.name or 'Patient name',
                 f"Total: {rec.amount_total:.2f} {rec.currency_id.name}" if rec.currency_id else '',
-                f"state: {dict(rec._fields['state'].selection).get(rec.state, rec.state)}",
+                f"state: {state_labels.get(rec.state, rec.state)}",
             ]
             rec.display_name = " | ".join(filter(None, parts))
\ No newline at end of file
@@ -0,0 +1,86 @@
+from odoo import models, fields, api
+
+
+class HmsCharge(models.Model):
+    _name = 'hms.charge'
+    _description = 'Pending Patient Charge'
+    _order = 'patient_id, id'
+
+    # ==========================
+    # FIELDS
+    # ==========================
+    patient_id = fields.Many2one(
+        'patient',
+        string='Patient',
+        required=True,
+        index=True,
+        ondelete='restrict',
+        help="Patient billed for the charge."
+    )
+
+    name = fields.Char(
+        string='Description',
+        required=True,
+        default='Service',
+        help="Label of the invoice line."
+    )
+
+    quantity = fields.Float(
+        string='Quantity',
+        default=1.0,
+        help="Quantity of the invoice line."
+    )
+
+    price_unit = fields.Float(
+        string='Unit Price',
+        help="Unit price of the invoice line."
+    )
+
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('invoiced', 'Invoiced'),
+    ], string='State', default='pending', required=True, readonly=True, index=True,
+       help="Pending charges are added to the draft invoice of the patient by the next materialization.")
+
+    invoice_id = fields.Many2one(
+        'account.move',
+        string='Invoice',
+        readonly=True,
+        ondelete='set null',
+        help="Invoice the charge was added to."
+    )
+
+    _sql_constraints = [
+        ('positive_price', 'CHECK(price_unit >= 0)', 'Invalid price in invoice line.'),
+    ]
+
+    # ==========================
+    # MATERIALIZATION
+    # ==========================
+    def _materialize(self):
+        """
+        Add the pending charges to the draft invoices of their patients,
+        with one write of the invoice lines per invoice.
+        """
+        service = self.env['invoice.service']
+        charges_by_invoice = {}
+        for patient, charges in self.filtered(lambda c: c.state == 'pending').grouped('patient_id').items():
+            invoice = service.get_or_create_draft_invoice(patient.id)
+            charges_by_invoice[invoice] = charges_by_invoice.get(invoice, self.browse()) | charges
+
+        for invoice, charges in charges_by_invoice.items():
+            service.append_invoice_lines(invoice, charges.read(['name', 'quantity', 'price_unit']))
+            charges.write({'state': 'invoiced', 'invoice_id': invoice.id})
+        return list(charges_by_invoice)
+
+    def action_materialize(self):
+        self._materialize()
+
+    @api.model
+    def _schedule_materialize(self):
+        """Have the pending charges added to their invoices by the cron right after the current transaction."""
+        self.env.ref('hms_invoicing.ir_cron_hms_charge_materialize').sudo()._trigger()
+
+    @api.model
+    def _cron_materialize_charges(self):
+        self.search([('state', '=', 'pending')])._materialize()
@@ -10,13 +10,20 @@ class InvoiceService(models.AbstractModel):
         """
         Retrieve an existing draft invoice for the patient’s partner
         (via user_id.partner_id), or create a new one if none exists.
+        The patient row is locked for the rest of the transaction and keeps a pointer
+        to its draft invoice, so concurrent charges never open a second draft.
         """
         if not patient_id:
             raise ValidationError("Patient ID is required to create an invoice.")
 
         patient = self.env['patient'].browse(patient_id)
+        patient._lock_for_invoicing()
         partner_id = patient.user_id.partner_id.id
 
+        invoice = patient.draft_invoice_id
+        if self._is_open_draft(invoice, partner_id):
+            return invoice
+
         invoice = self.env['account.move'].search([
             ('partner_id', '=', partner_id),
             ('state', '=', 'draft'),
@@ -30,8 +37,28 @@ class InvoiceService(models.AbstractModel):
                 'patient_id': patient.id,
             })
 
+        patient.draft_invoice_id = invoice
         return invoice
 
+    @api.model
+    def _is_open_draft(self, invoice, partner_id):
+        """Whether the draft invoice pointer of a patient can still receive its charges."""
+        return invoice.state == 'draft' and invoice.move_type == 'out_invoice' and invoice.partner_id.id == partner_id
+
+    @api.model
+    def _prepare_line_vals(self, line):
+        """
+        Validate a billable item and return its invoice line values.
+        """
+        price = line.get('price_unit', 0)
+        if price < 0:
+            raise ValidationError("Invalid price in invoice line.")
+        return {
+            'name': line.get('name') or 'Service',
+            'quantity': line.get('quantity', 1.0),
+            'price_unit': price,
+        }
+
     @api.model
     def append_invoice_lines(self, invoice, lines):
         """
@@ -40,18 +67,7 @@ class InvoiceService(models.AbstractModel):
         if not invoice or invoice.state != 'draft':
             raise ValidationError("Invoice must be in draft state to append lines.")
 
-        new_lines = []
-        for line in lines:
-            price = line.get('price_unit', 0)
-            if price < 0:
-                raise ValidationError("Invalid price in invoice line.")
-            quantity = line.get('quantity', 1.0)
-            new_lines.append((0, 0, {
-                'name': line.get('name') or 'Service',
-                'quantity': quantity,
-                'price_unit': price,
-            }))
-
+        new_lines = [(0, 0, self._prepare_line_vals(line)) for line in lines]
         invoice.write({'invoice_line_ids': new_lines})
 
     @api.model
@@ -62,3 +78,84 @@ class InvoiceService(models.AbstractModel):
         invoice = self.get_or_create_draft_invoice(patient_id)
         self.append_invoice_lines(invoice, lines)
         return invoice
+
+    @api.model
+    def add_invoice_items_bulk(self, lines_by_patient):
+        """
+        Add invoice lines for many patients at once, to the same drafts as `get_or_create_draft_invoice()`.
+        Partners and draft invoice pointers of all patients are read with one query, stale pointers
+        fall back to one search of the partners' drafts, missing drafts are created together,
+        and each invoice gets its lines in a single write.
+
+        :param lines_by_patient: {patient_id: [line values]}
+        :return: {patient_id: invoice}
+        """
+        lines_by_patient = {int(patient_id): lines for patient_id, lines in lines_by_patient.items()}
+        if not lines_by_patient:
+            return {}
+
+        Patient = self.env['patient']
+        Patient.browse(sorted(lines_by_patient))._lock_for_invoicing()
+        rows = Patient.with_context(active_test=False).search_read(
+            [('id', 'in', list(lines_by_patient))], ['invoice_partner_id', 'draft_invoice_id'], load=None
+        )
+        missing = set(lines_by_patient) - {row['id'] for row in rows}
+        if missing:
+            raise ValidationError("Unknown patients: %s" % ', '.join(map(str, sorted(missing))))
+        partners = {row['id']: row['invoice_partner_id'] for row in rows}
+
+        Move = self.env['account.move']
+        invoice_by_patient = {}
+        for row in rows:
+            invoice = Move.browse(row['draft_invoice_id'])
+            if invoice and self._is_open_draft(invoice, row['invoice_partner_id']):
+                invoice_by_patient[row['id']] = invoice
+
+        # stale or empty pointers: same pick as get_or_create_draft_invoice()
+        unresolved = {patient_id: partners[patient_id] for patient_id in partners if patient_id not in invoice_by_patient}
+        invoices = {}
+        if unresolved:
+            for invoice in Move.search([
+                ('partner_id', 'in', list(set(unresolved.values()))),
+                ('state', '=', 'draft'),
+                ('move_type', '=', 'out_invoice'),
+            ]):
+                # the first one in the default order, as with search(limit=1)
+                invoices.setdefault(invoice.partner_id.id, invoice)
+
+        to_create = {}
+        for patient_id, partner_id in unresolved.items():
+            if partner_id not in invoices:
+                to_create.setdefault(partner_id, patient_id)
+        if to_create:
+            new_invoices = Move.create([{
+                'move_type': 'out_invoice',
+                'partner_id': partner_id,
+                'patient_id': patient_id,
+            } for partner_id, patient_id in to_create.items()])
+            invoices.update(zip(to_create, new_invoices))
+        invoice_by_patient.update({patient_id: invoices[partner_id] for patient_id, partner_id in unresolved.items()})
+
+        patient_ids_by_invoice = {}
+        for patient_id, invoice in invoice_by_patient.items():
+            patient_ids_by_invoice.setdefault(invoice, []).append(patient_id)
+        for invoice, patient_ids in patient_ids_by_invoice.items():
+            self.append_invoice_lines(invoice, [
+                line for patient_id in patient_ids for line in lines_by_patient[patient_id]
+            ])
+            repointed = [patient_id for patient_id in patient_ids if patient_id in unresolved]
+            if repointed:
+                Patient.browse(repointed).write({'draft_invoice_id': invoice.id})
+        return invoice_by_patient
+
+    @api.model
+    def stage_invoice_items(self, patient_id, lines):
+        """
+        Record billable items of the patient as pending charges, without touching the invoice.
+        They are added to the draft invoice by `hms.charge._materialize()`.
+        """
+        if not patient_id:
+            raise ValidationError("Patient ID is required to record charges.")
+        return self.env['hms.charge'].create([
+            dict(self._prepare_line_vals(line), patient_id=patient_id) for line in lines
+        ])
@@ -0,0 +1,58 @@
+from odoo import models, api
+
+
+class IrSequence(models.Model):
+    _inherit = 'ir.sequence'
+
+    @api.model
+    def _next_by_code_batch(self, sequence_code, count):
+        """
+        Reserve `count` numbers of the sequence in one call, for batch creates.
+        Same lookup as `next_by_code()`; sequences using date ranges keep the regular allocation.
+
+        :return: list of `count` formatted numbers, or of False when the sequence doesn't exist.
+        """
+        if count <= 0:
+            return []
+        self.browse().check_access('read')
+        sequence = self.search([
+            ('code', '=', sequence_code),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+        if not sequence:
+            return [False] * count
+        if sequence.use_date_range:
+            return [sequence._next() for _i in range(count)]
+
+        if sequence.implementation == 'standard':
+            self.env.cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)", ['ir_sequence_%03d' % sequence.id, count]
+            )
+            numbers = sorted(number for number, in self.env.cr.fetchall())
+        else:
+            # no gap: lock the row once and move it past the whole block
+            self.env.cr.execute("SELECT number_next FROM ir_sequence WHERE id = %s FOR UPDATE NOWAIT", [sequence.id])
+            self.env.cr.execute("""
+                UPDATE ir_sequence
+                   SET number_next = number_next + %(step)s
+                 WHERE id = %(id)s
+             RETURNING number_next - %(step)s
+            """, {'step': sequence.number_increment * count, 'id': sequence.id})
+            first = self.env.cr.fetchone()[0]
+            sequence.invalidate_recordset(['number_next'])
+            numbers = range(first, first + sequence.number_increment * count, sequence.number_increment)
+
+        return [sequence.get_next_char(number) for number in numbers]
+
+    @api.model
+    def _assign_batch_names(self, vals_list, sequence_code, field='name'):
+        """
+        Fill `field` of the values that don't have one yet (or still have 'New') with
+        numbers of the sequence, all reserved with a single `_next_by_code_batch()` call.
+        Meant for the `create()` of models numbered by a sequence.
+        """
+        new_vals = [vals for vals in vals_list if vals.get(field, 'New') == 'New']
+        names = self._next_by_code_batch(sequence_code, len(new_vals))
+        for vals, name in zip(new_vals, names):
+            vals[field] = name or 'New'
+        return vals_list
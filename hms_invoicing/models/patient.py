@@ -0,0 +1,49 @@
+from odoo import models, fields, api
+
+
+class Patient(models.Model):
+    _inherit = 'patient'
+
+    # invoice pickers search moves by patient name
+    name = fields.Char(index='trigram')
+
+    draft_invoice_id = fields.Many2one(
+        'account.move',
+        string='Open Draft Invoice',
+        readonly=True,
+        copy=False,
+        ondelete='set null',
+        help="Draft invoice currently collecting the charges of the patient."
+    )
+    invoice_partner_id = fields.Many2one(
+        'res.partner',
+        string='Invoice Partner',
+        related='user_id.partner_id',
+        help="Partner the invoices of the patient are addressed to."
+    )
+
+    def _lock_for_invoicing(self):
+        """
+        Lock the patient rows until the end of the transaction, so charges of the same patient
+        are invoiced one transaction at a time. Rows are locked in id order to avoid deadlocks.
+        A transaction that waited for a concurrent one which moved the draft invoice pointer
+        gets a serialization failure, and Odoo retries it with a fresh snapshot.
+        """
+        if not self:
+            return
+        self.env.cr.execute(
+            f"SELECT id FROM {self._table} WHERE id IN %s ORDER BY id FOR UPDATE", [tuple(self.ids)]
+        )
+
+    @api.model
+    def _get_invoice_partners(self, patient_ids):
+        """
+        Invoice partner of the patients, resolved for the whole batch with one search_read.
+        Unknown patients are left out.
+
+        :return: {patient_id: partner_id or False}
+        """
+        rows = self.with_context(active_test=False).search_read(
+            [('id', 'in', list(patient_ids))], ['invoice_partner_id'], load=None
+        )
+        return {row['id']: row['invoice_partner_id'] for row in rows}
@@ -1 +1,4 @@
-from . import test_invoice_service
\ No newline at end of file
+from . import test_invoice_service
+from . import test_ir_sequence
+from . import test_hms_charge
+from . import test_account_move
\ No newline at end of file
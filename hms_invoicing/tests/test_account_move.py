@@ -0,0 +1,68 @@
+from unittest.mock import patch
+
+from odoo.sql_db import Cursor
+from odoo.tests.common import TransactionCase
+
+
+class TestAccountMove(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        users = self.env['res.users'].create([
+            {'name': f'Invoice Patient {i}', 'login': f'invoice_patient_{i}'} for i in range(20)
+        ])
+        self.patients = self.env['patient'].create([{'name': user.name, 'user_id': user.id} for user in users])
+
+    def _create_invoices(self, patients):
+        """Create one invoice per patient and return the number of queries reading patients."""
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = []
+        execute = Cursor.execute
+
+        def record_execute(cursor, query, params=None, log_exceptions=True):
+            queries.append(str(query))
+            return execute(cursor, query, params, log_exceptions)
+
+        with patch.object(Cursor, 'execute', autospec=True, side_effect=record_execute):
+            invoices = self.env['account.move'].create([
+                {'move_type': 'out_invoice', 'patient_id': patient.id} for patient in patients
+            ])
+        self.assertEqual(invoices.partner_id, patients.user_id.partner_id)
+        return sum(1 for query in queries if 'FROM "patient"' in query)
+
+    def test_partner_from_patient(self):
+        """
+        Test that invoices get the partner of their patient, unless one is given.
+        """
+        partner = self.env['res.partner'].create({'name': 'Guarantor'})
+        invoices = self.env['account.move'].create([
+            {'move_type': 'out_invoice', 'patient_id': self.patients[0].id},
+            {'move_type': 'out_invoice', 'patient_id': self.patients[1].id, 'partner_id': partner.id},
+        ])
+        self.assertEqual(invoices[0].partner_id, self.patients[0].user_id.partner_id)
+        self.assertEqual(invoices[1].partner_id, partner)
+
+    def test_constant_patient_queries(self):
+        """
+        Test that creating invoices reads patients with the same number of queries whatever the batch size.
+        """
+        small = self._create_invoices(self.patients[:2])
+        large = self._create_invoices(self.patients[2:])
+        self.assertEqual(small, large)
+
+    def test_display_name_and_patient_search(self):
+        """
+        Test the invoice label and that invoices are found by the name of their patient.
+        """
+        invoices = self.env['account.move'].create([
+            {'move_type': 'out_invoice', 'patient_id': patient.id} for patient in self.patients[:2]
+        ])
+        self.assertEqual(
+            invoices[0].display_name,
+            f"Invoice Patient 0 | Total: 0.00 {invoices[0].currency_id.name} | state: Draft",
+        )
+
+        found = self.env['account.move'].name_search('Invoice Patient 1', limit=10)
+        self.assertIn(invoices[1].id, [move_id for move_id, _name in found])
+        self.assertNotIn(invoices[0].id, [move_id for move_id, _name in found])
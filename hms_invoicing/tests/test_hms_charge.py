@@ -0,0 +1,50 @@
+from odoo.tests.common import TransactionCase
+from odoo.exceptions import ValidationError
+
+
+class TestHmsCharge(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.InvoiceService = self.env['invoice.service']
+        user = self.env['res.users'].create({'name': 'Charge Patient', 'login': 'charge_patient'})
+        self.patient = self.env['patient'].create({'name': 'Charge Patient', 'user_id': user.id})
+        self.partner = user.partner_id
+
+    def _get_draft_invoices(self):
+        return self.env['account.move'].search([
+            ('partner_id', '=', self.partner.id),
+            ('state', '=', 'draft'),
+            ('move_type', '=', 'out_invoice'),
+        ])
+
+    def test_stage_and_materialize(self):
+        """
+        Test that staged charges don't touch the invoice until they are materialized in one go.
+        """
+        charges = self.InvoiceService.stage_invoice_items(self.patient.id, [
+            {'name': 'Room Charge', 'price_unit': 50.0, 'quantity': 24},
+            {'name': 'Meals', 'price_unit': 10.0, 'quantity': 3},
+        ])
+        charges |= self.InvoiceService.stage_invoice_items(self.patient.id, [{'name': 'X-Ray', 'price_unit': 80.0}])
+        self.assertFalse(self._get_draft_invoices())
+        self.assertEqual(set(charges.mapped('state')), {'pending'})
+
+        charges._materialize()
+        invoice = self._get_draft_invoices()
+        self.assertEqual(len(invoice), 1)
+        self.assertEqual(sorted(invoice.invoice_line_ids.mapped('name')), ['Meals', 'Room Charge', 'X-Ray'])
+        self.assertAlmostEqual(invoice.amount_untaxed, 1310.0)
+        self.assertEqual(set(charges.mapped('state')), {'invoiced'})
+        self.assertEqual(charges.invoice_id, invoice)
+
+        # already invoiced charges are not added twice
+        self.env['hms.charge']._cron_materialize_charges()
+        self.assertEqual(len(invoice.invoice_line_ids), 3)
+
+    def test_stage_negative_price(self):
+        """
+        Test that charges with a negative price are refused when staged.
+        """
+        with self.assertRaises(ValidationError):
+            self.InvoiceService.stage_invoice_items(self.patient.id, [{'name': 'Refund', 'price_unit': -5.0}])
@@ -1,3 +1,6 @@
+import time
+
+from odoo.tests import tagged
 from odoo.tests.common import TransactionCase
 from odoo.exceptions import ValidationError
 
@@ -57,4 +60,95 @@ class TestInvoiceService(TransactionCase):
         self.assertIn('Blood Test', names)
         self.assertIn('MRI Scan', names)
         self.assertIn('Doctor Fees', names)
-        self.assertAlmostEqual(invoice.amount_total, 530.0)
\ No newline at end of file
+        self.assertAlmostEqual(invoice.amount_total, 530.0)
+
+    def test_draft_invoice_reused(self):
+
+        """
+        Test that successive charges reuse the draft invoice kept on the patient,
+        and that a new draft is opened once it is no longer in draft.
+        """
+
+        invoice = self.InvoiceService.get_or_create_draft_invoice(self.patient.id)
+        self.assertEqual(self.patient.draft_invoice_id, invoice)
+        self.assertEqual(self.InvoiceService.get_or_create_draft_invoice(self.patient.id), invoice)
+
+        invoice.button_cancel()
+        new_invoice = self.InvoiceService.get_or_create_draft_invoice(self.patient.id)
+        self.assertNotEqual(new_invoice, invoice)
+        self.assertEqual(self.patient.draft_invoice_id, new_invoice)
+
+    def test_add_invoice_items_bulk(self):
+
+        """
+        Test adding lines for several patients in one call, reusing existing drafts
+        and creating the missing ones.
+        """
+
+        patients = self.Patient.create([{
+            'name': f'Bulk Patient {i}',
+            'user_id': self.env['res.users'].create({'name': f'Bulk Patient {i}', 'login': f'bulk_invoice_{i}'}).id,
+        } for i in range(3)])
+        existing = self.InvoiceService.add_invoice_items(patients[0].id, [{'name': 'Consultation', 'price_unit': 50.0}])
+
+        invoices = self.InvoiceService.add_invoice_items_bulk({
+            patients[0].id: [{'name': 'Blood Test', 'price_unit': 80.0}],
+            patients[1].id: [{'name': 'MRI Scan', 'price_unit': 300.0}, {'name': 'Doctor Fees', 'price_unit': 150.0}],
+            str(patients[2].id): [{'name': 'ECG Test', 'price_unit': 120.0}],
+        })
+
+        self.assertEqual(invoices[patients[0].id], existing)
+        self.assertEqual(existing.invoice_line_ids.mapped('name'), ['Consultation', 'Blood Test'])
+        self.assertEqual(len(invoices[patients[1].id].invoice_line_ids), 2)
+        self.assertEqual(invoices[patients[2].id].partner_id, patients[2].user_id.partner_id)
+        self.assertEqual(patients.draft_invoice_id, existing | invoices[patients[1].id] | invoices[patients[2].id])
+
+        with self.assertRaises(ValidationError):
+            self.InvoiceService.add_invoice_items_bulk({0: [{'name': 'Ghost', 'price_unit': 1.0}]})
+
+    def test_add_invoice_items_bulk_follows_pointer(self):
+
+        """
+        Test that bulk billing uses the draft invoice kept on the patient,
+        like add_invoice_items, even when the partner has other drafts.
+        """
+
+        user = self.env['res.users'].create({'name': 'Pointer Patient', 'login': 'pointer_patient'})
+        patient = self.Patient.create({'name': 'Pointer Patient', 'user_id': user.id})
+        pointed = self.InvoiceService.get_or_create_draft_invoice(patient.id)
+        self.env['account.move'].create({'move_type': 'out_invoice', 'partner_id': user.partner_id.id})
+
+        invoices = self.InvoiceService.add_invoice_items_bulk({patient.id: [{'name': 'Blood Test', 'price_unit': 80.0}]})
+        self.assertEqual(invoices[patient.id], pointed)
+        self.assertEqual(self.InvoiceService.add_invoice_items(patient.id, [{'name': 'MRI Scan', 'price_unit': 300.0}]), pointed)
+        self.assertEqual(pointed.invoice_line_ids.mapped('name'), ['Blood Test', 'MRI Scan'])
+
+
+@tagged('-standard', 'hms_benchmark')
+class TestInvoiceServiceBenchmark(TransactionCase):
+
+    def test_add_invoice_items_bulk_500(self):
+        """
+        End of day billing of a 500 patient ward, one bulk call against one call per patient.
+        """
+        users = self.env['res.users'].create([
+            {'name': f'Ward Patient {i}', 'login': f'ward_patient_{i}'} for i in range(1000)
+        ])
+        patients = self.env['patient'].create([{'name': user.name, 'user_id': user.id} for user in users])
+        lines = [{'name': 'Room Charge', 'price_unit': 50.0, 'quantity': 24}, {'name': 'Meals', 'price_unit': 10.0}]
+        self.env.flush_all()
+
+        start = time.perf_counter()
+        for patient in patients[:500]:
+            self.env['invoice.service'].add_invoice_items(patient.id, lines)
+        self.env.flush_all()
+        single_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        invoices = self.env['invoice.service'].add_invoice_items_bulk({patient.id: lines for patient in patients[500:]})
+        self.env.flush_all()
+        bulk_duration = time.perf_counter() - start
+
+        self.assertEqual(len(set(invoices.values())), 500)
+        self.assertLess(bulk_duration, single_duration,
+                        f"bulk {bulk_duration:.2f}s vs one call per patient {single_duration:.2f}s")
@@ -0,0 +1,39 @@
+from odoo.tests.common import TransactionCase
+
+
+class TestSequenceBatch(TransactionCase):
+
+    def _create_sequence(self, implementation):
+        return self.env['ir.sequence'].create({
+            'name': f'Batch {implementation}',
+            'code': f'test.batch.{implementation}',
+            'implementation': implementation,
+            'prefix': 'TB/',
+            'padding': 4,
+        })
+
+    def test_reserve_block(self):
+        """
+        Test that a block of numbers is reserved in one call and the sequence continues after it.
+        """
+        for implementation in ('standard', 'no_gap'):
+            sequence = self._create_sequence(implementation)
+            names = self.env['ir.sequence']._next_by_code_batch(sequence.code, 3)
+            self.assertEqual(names, ['TB/0001', 'TB/0002', 'TB/0003'])
+            self.assertEqual(self.env['ir.sequence'].next_by_code(sequence.code), 'TB/0004')
+
+    def test_assign_batch_names(self):
+        """
+        Test that only the values without a name get one, in order.
+        """
+        sequence = self._create_sequence('standard')
+        vals_list = [{'name': 'New'}, {'name': 'Kept'}, {}]
+        self.env['ir.sequence']._assign_batch_names(vals_list, sequence.code)
+        self.assertEqual(vals_list, [{'name': 'TB/0001'}, {'name': 'Kept'}, {'name': 'TB/0002'}])
+
+    def test_unknown_code(self):
+        """
+        Test that an unknown sequence gives False for every record, like next_by_code.
+        """
+        self.assertEqual(self.env['ir.sequence']._next_by_code_batch('test.batch.unknown', 2), [False, False])
+        self.assertEqual(self.env['ir.sequence']._next_by_code_batch('test.batch.unknown', 0), [])
@@ -1,6 +1,6 @@
 {
     'name': 'Hospital - Room Management',
-    'version': '1.0',
+    'version': '1.1',
     'summary': 'Manage hospital rooms, beds, and related services',
     'depends': ['base','hms_base','hms_patient','hms_clinics','hms_invoicing','hms_appointment'],
     'data': [
@@ -8,6 +8,8 @@
         'data/patient_admission_sequence.xml',
         'data/room_service_sequence.xml',
         'data/room_sequence.xml',
+        'data/room_availability_data.xml',
+        'data/room_cron.xml',
         'views/actions.xml',
         'views/menus.xml',
         'views/room_views.xml',
@@ -15,6 +17,9 @@
         'views/patient_admission_views.xml',
         'views/appointment_view.xml',
     ],
+    'external_dependencies': {
+        'python': ['numpy'],
+    },
     'installable': True,
     'application': True,
 }
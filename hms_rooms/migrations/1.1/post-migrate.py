@@ -0,0 +1,23 @@
+from odoo import SUPERUSER_ID, api, fields
+
+
+def migrate(cr, version):
+    """
+    Give the admissions already in progress the bed slot they would have claimed when confirmed,
+    so that pre-bookings see the beds occupied today.
+    """
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    admissions = env['patient.admission'].search([('state', '=', 'in_progress'), ('bed_slot_ids', '=', False)])
+    now = fields.Datetime.now()
+    vals_list = []
+    for admission in admissions:
+        start = admission.admission_date or admission.create_date
+        stop = admission.expected_discharge_date
+        vals_list.append({
+            'room_id': admission.room_id.id,
+            'admission_id': admission.id,
+            'start_date': start,
+            # the patient is still there: hold the bed until discharge once the expected date has passed
+            'stop_date': stop if stop and stop > max(start, now) else False,
+        })
+    env['room.bed.slot'].create(vals_list)
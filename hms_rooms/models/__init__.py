@@ -1,4 +1,7 @@
 from . import room
+from . import room_availability
+from . import room_bed_slot
 from . import room_service
 from . import patient_admission
 from . import appointment
+from . import occupancy_analytics
@@ -1,28 +1,34 @@
+import logging
+
 from odoo import models, fields, api
 
+_logger = logging.getLogger(__name__)
+
 
 class Appointment(models.Model):
     _inherit = 'appointment'
 
     flag_book_room = fields.Boolean(compute='_computed_show_create_admission', default=True)
 
-    def _check_patient_admission(self):
+    def _get_admitted_patient_ids(self):
         """
-        Check if the current patient has any active admissions.
+        Patients of the recordset having an active admission.
 
-        Searches the 'patient.admission' model for an admission record:
-            - Linked to the same patient as the current record.
+        Groups the 'patient.admission' records:
+            - Linked to the patients of the appointments.
             - With a state different from 'discharged'.
 
         Returns:
-            bool: True if at least one active admission exists, otherwise False.
+            set: ids of the patients with at least one active admission, found with a single query.
         """
-        PatientAdmission = self.env['patient.admission']
-        admission = PatientAdmission.search([
-            ('patient_id', '=', self.patient_id.id),
+        patient_ids = self.patient_id.ids
+        if not patient_ids:
+            return set()
+        groups = self.env['patient.admission']._read_group([
+            ('patient_id', 'in', patient_ids),
             ('state', '!=', 'discharged')
-        ], limit=1)
-        return admission
+        ], groupby=['patient_id'])
+        return {patient.id for patient, in groups}
 
     @api.depends('state')
     def _computed_show_create_admission(self):
@@ -34,18 +40,15 @@ class Appointment(models.Model):
           - If the patient currently has an active admission (state != 'discharged')
 
         In either of these cases, 'flag_book_room' will be set to True; otherwise, it will be set to False.
+        Active admissions are looked up once for the whole recordset.
 
         Sets:
             flag_book_room (bool): Indicates whether a "create admission" action should be shown/allowed.
         """
+        admitted_patient_ids = self._get_admitted_patient_ids()
         for rec in self:
-            admission = rec._check_patient_admission()
-            if rec.state in ['draft', 'cancelled'] or admission:
-                rec.flag_book_room = True
-            else:
-                rec.flag_book_room = False
-
-            print(rec.flag_book_room)
+            rec.flag_book_room = rec.state in ['draft', 'cancelled'] or rec.patient_id.id in admitted_patient_ids
+            _logger.debug("Appointment %s: flag_book_room=%s", rec.id, rec.flag_book_room)
 
     def action_open_patient_admission(self):
         """
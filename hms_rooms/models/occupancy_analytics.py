@@ -0,0 +1,202 @@
+from datetime import datetime, time, timedelta
+
+import numpy as np
+
+from odoo import models, fields, api
+
+HOUR = 3600
+DAY_HOURS = 24
+# Admission fields changing the occupancy, writing them drops the cached days
+OCCUPANCY_FIELDS = {'admission_date', 'discharge_date', 'room_id', 'state'}
+
+
+class RoomOccupancyDay(models.Model):
+    _name = 'room.occupancy.day'
+    _description = 'Cached Daily Bed Occupancy'
+    _order = 'day'
+
+    day = fields.Date(string='Day', required=True, index=True)
+    clinic_id = fields.Many2one('clinic', string='Clinic', ondelete='cascade')
+    room_type = fields.Selection([
+        ('standard', 'Standard'),
+        ('private', 'Private')
+    ], string='Room Type')
+    hourly_occupancy = fields.Json(string='Hourly Occupied Beds')
+    discharges = fields.Integer(string='Discharges')
+    stay_hours = fields.Float(string='Stay Hours of Discharged Patients')
+
+
+class OccupancyAnalytics(models.AbstractModel):
+    _name = 'occupancy.analytics'
+    _description = 'Bed Occupancy Analytics'
+
+    # ==========================
+    # DATA
+    # ==========================
+    @api.model
+    def _fetch_intervals(self, date_from, date_to, clinic_id=False, room_type=False):
+        """
+        Stays overlapping [date_from, date_to) with one `search_read`, as epoch second arrays.
+        Ongoing stays end now.
+
+        :return: (starts, stops, discharged) numpy arrays
+        """
+        domain = [
+            ('state', 'in', ['in_progress', 'discharged']),
+            ('admission_date', '<', date_to),
+            '|', ('discharge_date', '=', False), ('discharge_date', '>', date_from),
+        ]
+        if clinic_id:
+            domain.append(('room_id.clinic_id', '=', clinic_id))
+        if room_type:
+            domain.append(('room_id.room_type', '=', room_type))
+        rows = self.env['patient.admission'].search_read(domain, ['admission_date', 'discharge_date'])
+
+        now = fields.Datetime.now()
+        starts = np.array([row['admission_date'] for row in rows], dtype='datetime64[s]').astype(np.int64)
+        stops = np.array([row['discharge_date'] or now for row in rows], dtype='datetime64[s]').astype(np.int64)
+        discharged = np.array([bool(row['discharge_date']) for row in rows], dtype=bool)
+        return starts.astype(float), np.maximum(stops, starts).astype(float), discharged
+
+    @api.model
+    def _occupied_seconds(self, starts, stops, edges):
+        """
+        Sweep line: bed-seconds occupied from the epoch up to each edge, for all stays at once.
+        F(t) = sum(t - start for start <= t) - sum(t - stop for stop <= t)
+        """
+        starts = np.sort(starts)
+        stops = np.sort(stops)
+        start_sums = np.concatenate(([0.0], np.cumsum(starts)))
+        stop_sums = np.concatenate(([0.0], np.cumsum(stops)))
+        started = np.searchsorted(starts, edges, side='right')
+        stopped = np.searchsorted(stops, edges, side='right')
+        return (started * edges - start_sums[started]) - (stopped * edges - stop_sums[stopped])
+
+    @api.model
+    def _compute_days(self, days, clinic_id=False, room_type=False):
+        """
+        Hourly occupancy, discharges and stay hours of the given days, in one fetch and one
+        vectorized pass over the span of the days.
+
+        :return: {day: {'hourly_occupancy': [24 floats], 'discharges': int, 'stay_hours': float}}
+        """
+        first, last = min(days), max(days)
+        date_from = datetime.combine(first, time.min)
+        date_to = datetime.combine(last + timedelta(days=1), time.min)
+        starts, stops, discharged = self._fetch_intervals(date_from, date_to, clinic_id, room_type)
+
+        epoch_from = np.datetime64(date_from, 's').astype(np.int64)
+        day_count = (last - first).days + 1
+        edges = epoch_from + np.arange(day_count * DAY_HOURS + 1, dtype=float) * HOUR
+        hourly = (np.diff(self._occupied_seconds(starts, stops, edges)) / HOUR).reshape(day_count, DAY_HOURS)
+
+        # discharges and length of the discharged stays, bucketed by discharge day
+        day_index = ((stops[discharged] - epoch_from) // (DAY_HOURS * HOUR)).astype(np.int64)
+        in_range = (day_index >= 0) & (day_index < day_count)
+        day_index = day_index[in_range]
+        stay_hours = ((stops - starts)[discharged][in_range]) / HOUR
+        discharges = np.bincount(day_index, minlength=day_count)
+        stay_totals = np.bincount(day_index, weights=stay_hours, minlength=day_count)
+
+        result = {}
+        for day in days:
+            index = (day - first).days
+            result[day] = {
+                'hourly_occupancy': np.round(hourly[index], 4).tolist(),
+                'discharges': int(discharges[index]),
+                'stay_hours': float(stay_totals[index]),
+            }
+        return result
+
+    @api.model
+    def _get_days(self, days, clinic_id=False, room_type=False):
+        """
+        Daily stats, from the cache when possible. Missing past days are computed together
+        and cached, today and future days are always recomputed.
+        """
+        Cache = self.env['room.occupancy.day'].sudo()
+        cached = Cache.search_read([
+            ('day', 'in', days),
+            ('clinic_id', '=', clinic_id or False),
+            ('room_type', '=', room_type or False),
+        ], ['day', 'hourly_occupancy', 'discharges', 'stay_hours'])
+        stats = {row['day']: row for row in cached}
+
+        missing = [day for day in days if day not in stats]
+        if missing:
+            computed = self._compute_days(missing, clinic_id, room_type)
+            stats.update(computed)
+            today = fields.Date.context_today(self)
+            Cache.create([
+                dict(values, day=day, clinic_id=clinic_id or False, room_type=room_type or False)
+                for day, values in computed.items() if day < today
+            ])
+        return stats
+
+    @api.model
+    def _invalidate_days(self, admissions):
+        """Drop the cached days covered by the stays of the admissions."""
+        starts = [date for date in admissions.mapped('admission_date') if date]
+        if not starts:
+            return
+        today = fields.Date.context_today(self)
+        stops = [date.date() for date in admissions.mapped('discharge_date') if date]
+        last_day = today if len(stops) < len(starts) else max(stops)
+        self.env['room.occupancy.day'].sudo().search([
+            ('day', '>=', min(starts).date()),
+            ('day', '<=', last_day),
+        ]).unlink()
+
+    # ==========================
+    # API
+    # ==========================
+    @api.model
+    def get_occupancy(self, date_from, date_to, interval='day', clinic_id=False, room_type=False):
+        """
+        Bed occupancy over [date_from, date_to).
+
+        :param date_from: first day (date or 'YYYY-MM-DD').
+        :param date_to: day after the last one.
+        :param interval: 'day' or 'hour' buckets.
+        :param clinic_id, room_type: optional scope.
+        :return: {
+            'beds': bed count of the rooms in scope,
+            'buckets': [{'start', 'occupied_beds', 'occupancy_rate'}],
+            'average_length_of_stay': hours, for stays discharged in the period,
+            'turnover': discharges per bed over the period,
+        }
+        """
+        date_from = fields.Date.to_date(date_from)
+        date_to = fields.Date.to_date(date_to)
+        days = [date_from + timedelta(days=offset) for offset in range((date_to - date_from).days)]
+        if not days:
+            return {'beds': 0, 'buckets': [], 'average_length_of_stay': 0.0, 'turnover': 0.0}
+
+        room_domain = []
+        if clinic_id:
+            room_domain.append(('clinic_id', '=', clinic_id))
+        if room_type:
+            room_domain.append(('room_type', '=', room_type))
+        beds = sum(row['bed_count'] for row in self.env['room'].search_read(room_domain, ['bed_count']))
+
+        stats = self._get_days(days, clinic_id, room_type)
+        hourly = np.array([stats[day]['hourly_occupancy'] for day in days], dtype=float)
+        if interval == 'hour':
+            occupied = hourly.ravel()
+            starts = [datetime.combine(day, time(hour)) for day in days for hour in range(DAY_HOURS)]
+        else:
+            occupied = hourly.mean(axis=1)
+            starts = [datetime.combine(day, time.min) for day in days]
+
+        discharges = sum(stats[day]['discharges'] for day in days)
+        stay_hours = sum(stats[day]['stay_hours'] for day in days)
+        return {
+            'beds': beds,
+            'buckets': [{
+                'start': fields.Datetime.to_string(start),
+                'occupied_beds': round(float(value), 2),
+                'occupancy_rate': round(float(value) / beds, 4) if beds else 0.0,
+            } for start, value in zip(starts, occupied)],
+            'average_length_of_stay': round(stay_hours / discharges, 2) if discharges else 0.0,
+            'turnover': round(discharges / beds, 4) if beds else 0.0,
+        }
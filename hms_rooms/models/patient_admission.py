@@ -1,6 +1,7 @@
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
-from datetime import datetime
+
+from .occupancy_analytics import OCCUPANCY_FIELDS
 
 
 class PatientAdmission(models.Model):
@@ -45,6 +46,19 @@ class PatientAdmission(models.Model):
         help="Date and time when the patient was discharged."
     )
 
+    expected_discharge_date = fields.Datetime(
+        string='Expected Discharge Date',
+        help="Planned end of the stay, the bed is held until then. Leave empty to hold it until discharge."
+    )
+
+    bed_slot_ids = fields.One2many(
+        'room.bed.slot',
+        'admission_id',
+        string='Bed Slots',
+        readonly=True,
+        help="Bed held in the room for this admission."
+    )
+
     room_type = fields.Selection([
         ('standard', 'Standard'),
         ('private', 'Private')
@@ -93,26 +107,31 @@ class PatientAdmission(models.Model):
         store=True,
         help="Total calculated price for the patient's stay."
     )
+    price_snapshot = fields.Json(
+        string='Price Snapshot',
+        readonly=True,
+        copy=False,
+        help="Room and optional service hourly rates frozen at discharge, "
+             "later price changes don't affect the admission."
+    )
     show_discharge_button = fields.Boolean(
         compute='_compute_show_discharge_button',
         store=False
     )
 
     # ==========================
-    # HELPERS
+    # CONSTRAINTS
     # ==========================
-    def _update_room_state(self):
-        """Updates the room state based on the number of booked beds."""
-        booked = self.room_id.booked_beds
-        capacity = self.room_id.bed_count
-
-        if booked <= 0:
-            self.room_id.state = 'available'
-        elif booked < capacity:
-            self.room_id.state = 'partially_booked'
-        else:
-            self.room_id.state = 'fully_booked'
+    @api.constrains('admission_date', 'expected_discharge_date')
+    def _check_expected_discharge_date(self):
+        """The expected discharge must come after the admission."""
+        for rec in self:
+            if rec.admission_date and rec.expected_discharge_date and rec.expected_discharge_date <= rec.admission_date:
+                raise ValidationError("The expected discharge date must be after the admission date.")
 
+    # ==========================
+    # HELPERS
+    # ==========================
     def _get_stay_hours(self):
         """Total stay duration in hours, raises error if dates missing."""
         if not (self.admission_date and self.discharge_date):
@@ -123,26 +142,75 @@ class PatientAdmission(models.Model):
         """Total hourly rate (room + optional services), raises error if room missing."""
         if not self.room_id:
             raise ValidationError("Room is required to calculate hourly rate.")
-        return self.room_id.total_base_hourly_price + sum(s.price for s in self.optional_room_service_ids)
+        return self._get_price_rates()[self.id]['hourly_rate']
+
+    def _get_price_rates(self):
+        """
+        Hourly rates of the admissions, computed in one pass over the recordset.
+        Admissions with a price snapshot use it, the others the current prices:
+        the rate of each room and the sum of each set of optional services are computed once.
 
-    def _prepare_invoice_lines(self):
+        :return: {admission_id: {'room': rate, 'services': {service_id: price}, 'hourly_rate': total}}
+        """
+        room_rates = {}
+        set_rates = {}
+        rates = {}
+        for rec in self:
+            if rec.price_snapshot:
+                room_rate = rec.price_snapshot['room']
+                service_prices = {int(service_id): price
+                                  for service_id, price in rec.price_snapshot['services'].items()}
+                services_rate = sum(service_prices.values())
+            else:
+                room = rec.room_id
+                if room.id not in room_rates:
+                    room_rates[room.id] = room.total_base_hourly_price
+                room_rate = room_rates[room.id]
+                services = rec.optional_room_service_ids
+                service_prices = dict(zip(services.ids, services.mapped('price')))
+                key = tuple(sorted(service_prices))
+                if key not in set_rates:
+                    set_rates[key] = sum(service_prices.values())
+                services_rate = set_rates[key]
+            rates[rec.id] = {
+                'room': room_rate,
+                'services': service_prices,
+                'hourly_rate': room_rate + services_rate,
+            }
+        return rates
+
+    def _snapshot_prices(self):
+        """Freeze the current hourly rates on the admissions."""
+        to_snapshot = self.filtered(lambda rec: not rec.price_snapshot)
+        rates = to_snapshot._get_price_rates()
+        for rec in to_snapshot:
+            rate = rates[rec.id]
+            rec.price_snapshot = {
+                'room': rate['room'],
+                'services': {str(service_id): price for service_id, price in rate['services'].items()},
+            }
+
+    def _prepare_invoice_lines(self, rates=None):
         """
         Prepares invoice lines for room charges and optional services.
+
+        :param rates: result of `_get_price_rates()` when pricing several admissions.
         """
         stay_hours = self._get_stay_hours()
+        rate = (rates or self._get_price_rates())[self.id]
         invoice_lines = []
 
         invoice_lines.append({
             'name': f"Room Charge: {self.room_id.name}",
             'quantity': stay_hours,
-            'price_unit': self.room_id.total_base_hourly_price,
+            'price_unit': rate['room'],
         })
 
         for service in self.optional_room_service_ids:
             invoice_lines.append({
                 'name': f"Service: {service.service_name or service.name}",
                 'quantity': stay_hours,
-                'price_unit': service.price,
+                'price_unit': rate['services'].get(service.id, service.price),
             })
 
         return invoice_lines
@@ -161,16 +229,19 @@ class PatientAdmission(models.Model):
             else:
                 rec.basic_room_service_ids = False
 
-    @api.depends('room_id', 'admission_date', 'discharge_date', 'optional_room_service_ids')
+    @api.depends('room_id', 'admission_date', 'discharge_date', 'optional_room_service_ids', 'price_snapshot')
     def _compute_total_price(self):
         """Calculate total stay price based on hours stayed and hourly rate."""
+        to_price = self.filtered(lambda rec: rec.admission_date and rec.discharge_date and rec.room_id)
+        rates = to_price._get_price_rates()
         for rec in self:
-            if rec.admission_date and rec.discharge_date and rec.room_id:
-                if rec._get_stay_hours() <= 0:
+            if rec.id in rates:
+                stay_hours = rec._get_stay_hours()
+                if stay_hours <= 0:
                     raise ValidationError(
                         "Discharge date must be after admission date. Stay hours must be positive."
                     )
-                rec.total_price = rec._get_stay_hours() * rec._get_hourly_rate()
+                rec.total_price = stay_hours * rates[rec.id]['hourly_rate']
             else:
                 rec.total_price = 0.0
 
@@ -191,61 +262,102 @@ class PatientAdmission(models.Model):
     # ==========================
     def _check_state_transition(self, expected_state):
         """
-        Method to validate state before performing an action.
+        Method to validate state before performing an action, for every admission of the recordset.
         """
-        self.ensure_one()
-
-        if self.state != expected_state:
+        if self.filtered(lambda rec: rec.state != expected_state):
             raise ValidationError(f"This action can only be performed when the admission is in '{expected_state}' state.")
 
-    def action_confirm(self):
+    def action_schedule(self):
         """
-        Confirms the patient admission.
+        Pre-books a bed for draft admissions, from their admission date to their expected discharge date.
         """
         self._check_state_transition('draft')
+        if self.filtered('bed_slot_ids'):
+            raise ValidationError("A bed is already reserved for this admission.")
+        if self.filtered(lambda rec: not rec.admission_date):
+            raise ValidationError("The admission date is required to reserve a bed in advance.")
 
-        if self.room_id.booked_beds >= self.room_id.bed_count:
-            raise ValidationError("This room is fully booked.")
+        for room, admissions in self.grouped('room_id').items():
+            room._claim_bed_slots(admissions)
 
-        self.room_id.booked_beds += 1
-        self._update_room_state()
+    def action_confirm(self):
+        """
+        Confirms the patient admissions.
+        Beds are booked with one reservation per room, admissions without a pre-booked
+        bed slot claim one from now on.
+        """
+        self._check_state_transition('draft')
 
-        self.state = 'in_progress'
-        if not self.admission_date:
-            self.admission_date = datetime.now()
+        now = fields.Datetime.now()
+        for room, admissions in self.grouped('room_id').items():
+            unscheduled = admissions.filtered(lambda rec: not rec.bed_slot_ids)
+            if unscheduled:
+                room._claim_bed_slots(unscheduled, start=now)
+            room._reserve_beds(len(admissions))
+
+        self.write({'state': 'in_progress'})
+        self.filtered(lambda rec: not rec.admission_date).write({'admission_date': now})
 
     def action_discharge(self):
         """
-        Discharges the patient.
-        Generate and add invoice lines.
+        Discharges the patients.
+        Beds are released with one update per room. The stay charges are staged as pending
+        `hms.charge` records and added to the draft invoices by the materialization cron,
+        so long stays don't rewrite the invoice lines at every discharge.
         """
         self._check_state_transition('in_progress')
 
-        self.discharge_date = datetime.now()
-        self.room_id.booked_beds -= 1
-        self._update_room_state()
+        self._snapshot_prices()
+        now = fields.Datetime.now()
+        self.write({'discharge_date': now})
+        for room, admissions in self.grouped('room_id').items():
+            room._release_beds(len(admissions))
+
+        # free the bed from now on, slots that haven't started yet are dropped
+        slots = self.bed_slot_ids
+        slots.filtered(lambda slot: slot.start_date >= now).unlink()
+        slots.exists().write({'stop_date': now})
 
-        self.state = 'discharged'
+        self.write({'state': 'discharged'})
 
-        invoice_lines = self._prepare_invoice_lines()
-        self.env['invoice.service'].add_invoice_items(self.patient_id.id, invoice_lines)
+        rates = self._get_price_rates()
+        for patient, admissions in self.grouped('patient_id').items():
+            invoice_lines = [line for admission in admissions for line in admission._prepare_invoice_lines(rates)]
+            self.env['invoice.service'].stage_invoice_items(patient.id, invoice_lines)
+        self.env['hms.charge']._schedule_materialize()
 
     def action_set_cancelled(self):
         """
         Set the case state to 'cancelled'.
         """
 
+        self.bed_slot_ids.unlink()
         self.write({'state': 'cancelled'})
 
     # ==========================
     # OVERRIDES
     # ==========================
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """
         Overrides create method to generate a unique sequence for 'name'.
         """
-        print(vals)
-        if vals.get('name', 'New') == 'New':
-            vals['name'] = self.env['ir.sequence'].next_by_code('patient.admission') or 'New'
-        return super().create(vals)
+        self.env['ir.sequence']._assign_batch_names(vals_list, 'patient.admission')
+        admissions = super().create(vals_list)
+        self.env['occupancy.analytics']._invalidate_days(admissions)
+        return admissions
+
+    def write(self, vals):
+        """
+        Drops the cached occupancy of the days covered by the stays, before and after the change.
+        """
+        if not OCCUPANCY_FIELDS.intersection(vals):
+            return super().write(vals)
+        self.env['occupancy.analytics']._invalidate_days(self)
+        res = super().write(vals)
+        self.env['occupancy.analytics']._invalidate_days(self)
+        return res
+
+    def unlink(self):
+        self.env['occupancy.analytics']._invalidate_days(self)
+        return super().unlink()
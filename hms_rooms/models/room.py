@@ -1,10 +1,31 @@
+import logging
+
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
+
+# How long a booking waits for another transaction holding the room row
+BED_LOCK_TIMEOUT = 5000  # milliseconds
+
+# Fields changing the bed availability of a room
+AVAILABILITY_FIELDS = {'clinic_id', 'room_type', 'basic_service_ids', 'bed_count', 'booked_beds', 'state'}
+
+# Room state derived from the booked beds, for rooms that can be booked
+BED_STATE_SQL = """
+    CASE WHEN state NOT IN ('available', 'partially_booked', 'fully_booked') THEN state
+         WHEN {booked} <= 0 THEN 'available'
+         WHEN {booked} < bed_count THEN 'partially_booked'
+         ELSE 'fully_booked'
+    END
+"""
 
 
 class Room(models.Model):
     _name = 'room'
     _description = 'Hospital Room'
+    _rec_names_search = ['display_name']
 
     # ==========================
     # FIELDS
@@ -21,6 +42,7 @@ class Room(models.Model):
         string="Display Name",
         compute='_compute_display_name',
         store=True,
+        index='trigram',
         help="Automatically generated name combining room code, type, and clinic."
     )
 
@@ -50,6 +72,14 @@ class Room(models.Model):
         help="List of basic services included with the room."
     )
 
+    service_set_key = fields.Char(
+        string='Basic Services Key',
+        compute='_compute_service_set_key',
+        store=True,
+        index=True,
+        help="Sorted ids of the basic services, used to group rooms in the bed availability."
+    )
+
     base_hourly_price = fields.Float(
         string='Base Hourly Price',
         help="Base cost per hour for using this room (excluding services)."
@@ -84,6 +114,10 @@ class Room(models.Model):
         help="Number of beds still available for booking."
     )
 
+    def init(self):
+        # booking domain: bookable rooms of a type in a clinic
+        create_index(self.env.cr, 'room_state_type_clinic_index', self._table, ['state', 'room_type', 'clinic_id'])
+
     # ==========================
     # ONCHANGE METHODS
     # ==========================
@@ -100,17 +134,31 @@ class Room(models.Model):
     # ==========================
     # COMPUTE METHODS
     # ==========================
-    @api.depends('base_hourly_price', 'basic_service_ids')
+    @api.depends('base_hourly_price', 'basic_service_ids', 'basic_service_ids.price')
     def _compute_total_base_hourly_price(self):
         """
         Calculates the total hourly price by adding the base price
         and the prices of all linked basic services.
+        Rooms sharing the same basic services reuse the price of the service set,
+        and a change of a service price recomputes the rooms using it.
         """
+        set_prices = {}
         for rec in self:
-            total_price = rec.base_hourly_price or 0.0
-            for service in rec.basic_service_ids:
-                total_price += service.price
-            rec.total_base_hourly_price = total_price
+            services = rec.basic_service_ids
+            key = tuple(sorted(services.ids))
+            if key not in set_prices:
+                set_prices[key] = sum(services.mapped('price'))
+            rec.total_base_hourly_price = (rec.base_hourly_price or 0.0) + set_prices[key]
+
+    @api.model
+    def _get_service_set_key(self, service_ids):
+        """Key of a set of basic services, 'none' for rooms without basic services."""
+        return ','.join(str(service_id) for service_id in sorted(set(service_ids))) or 'none'
+
+    @api.depends('basic_service_ids')
+    def _compute_service_set_key(self):
+        for rec in self:
+            rec.service_set_key = self._get_service_set_key(rec.basic_service_ids.ids)
 
     @api.depends('bed_count', 'booked_beds')
     def _compute_available_beds(self):
@@ -121,17 +169,199 @@ class Room(models.Model):
         for rec in self:
             rec.available_beds = rec.bed_count - rec.booked_beds
 
-    @api.depends('name', 'room_type', 'clinic_id')
+    @api.depends('name', 'room_type', 'clinic_id', 'clinic_id.name')
     def _compute_display_name(self):
         """
         Generates a display name in the format:
         <Room Code> — <Room Type> — <Clinic Name>
         """
+        room_type_labels = dict(self._fields['room_type'].selection)
         for rec in self:
-            room_type_label = dict(rec._fields['room_type'].selection).get(rec.room_type, '')
+            room_type_label = room_type_labels.get(rec.room_type, '')
             clinic_name = rec.clinic_id.name or ''
             rec.display_name = f"{rec.name} — {room_type_label} — {clinic_name}"
 
+    # ==========================
+    # BED RESERVATION
+    # ==========================
+    def _lock_for_booking(self):
+        """
+        Lock the room row until the end of the transaction, waiting at most BED_LOCK_TIMEOUT
+        for another booking of the room, like `_lock_for_invoicing` does for patients.
+        A lock timeout or a serialization failure (the row changed since our snapshot)
+        is left to Odoo, which retries the whole transaction.
+        """
+        self.ensure_one()
+        self.env.cr.execute("SET LOCAL lock_timeout = %s", [BED_LOCK_TIMEOUT])
+        self.env.cr.execute("SELECT id FROM room WHERE id = %s FOR UPDATE", [self.id])
+        self.env.cr.execute("SET LOCAL lock_timeout TO DEFAULT")
+
+    def _update_booked_beds(self, delta, condition=''):
+        """
+        Atomically add `delta` to the booked beds and update the state and available beds
+        in the same UPDATE. Returns the new booked beds, or None when `condition` didn't match.
+        """
+        self.flush_recordset(['bed_count', 'booked_beds', 'state'])
+        booked = "GREATEST(booked_beds + %(delta)s, 0)"
+        self.env.cr.execute(f"""
+            UPDATE room
+               SET booked_beds = {booked},
+                   available_beds = bed_count - {booked},
+                   state = {BED_STATE_SQL.format(booked=booked)},
+                   write_uid = %(uid)s,
+                   write_date = (now() at time zone 'UTC')
+             WHERE id = %(id)s {condition}
+         RETURNING booked_beds
+        """, {'delta': delta, 'uid': self.env.uid, 'id': self.id})
+        row = self.env.cr.fetchone()
+        self.invalidate_recordset(['booked_beds', 'available_beds', 'state', 'write_uid', 'write_date'])
+        if row:
+            self.env['room.availability']._schedule_refresh()
+        return row[0] if row else None
+
+    def _get_free_capacity(self, start, stop=None):
+        """
+        Beds of each room that stay free during the whole [start, stop) window,
+        taking every bed slot (current stays and pre-bookings) into account.
+
+        :return: {room_id: free beds}
+        """
+        peaks = self.env['room.bed.slot']._get_peak_occupancy(self.ids, start, stop)
+        return {rec.id: rec.bed_count - peaks.get(rec.id, 0) for rec in self}
+
+    def _claim_bed_slots(self, admissions, start=None):
+        """
+        Hold one bed of the room for each admission, from `start` (or its admission date)
+        to its expected discharge date, under the room lock.
+        All admissions are first checked together over their combined window, and one by one
+        only when that conservative check fails.
+        """
+        windows = [
+            (admission, start or admission.admission_date or fields.Datetime.now(), admission.expected_discharge_date)
+            for admission in admissions
+        ]
+        ended = [admission.name for admission, slot_start, slot_stop in windows if slot_stop and slot_stop <= slot_start]
+        if ended:
+            raise ValidationError(
+                "The expected discharge date must be after the start of the stay: %s" % ', '.join(ended)
+            )
+        self._lock_for_booking()
+        window_start = min(slot_start for _admission, slot_start, _stop in windows)
+        stops = [stop for _admission, _start, stop in windows]
+        window_stop = None if not all(stops) else max(stops)
+
+        if self._get_free_capacity(window_start, window_stop)[self.id] < len(windows):
+            slots = self.env['room.bed.slot']
+            for admission, slot_start, slot_stop in windows:
+                if self._get_free_capacity(slot_start, slot_stop)[self.id] < 1:
+                    raise ValidationError("Not enough free beds in this room for the requested period.")
+                slots |= slots.create({
+                    'room_id': self.id, 'admission_id': admission.id,
+                    'start_date': slot_start, 'stop_date': slot_stop,
+                })
+            return slots
+
+        return self.env['room.bed.slot'].create([{
+            'room_id': self.id, 'admission_id': admission.id,
+            'start_date': slot_start, 'stop_date': slot_stop,
+        } for admission, slot_start, slot_stop in windows])
+
+    def _get_availability_keys(self):
+        return {(rec.clinic_id.id, rec.room_type, rec.service_set_key) for rec in self}
+
+    def _refresh_bed_availability(self, keys=None):
+        """Update the bed availability lines of the rooms (and of `keys` they were moved from)."""
+        self.env['room.availability'].sudo()._refresh(self._get_availability_keys() | set(keys or ()))
+
+    def _reserve_beds(self, count=1):
+        """
+        Book `count` beds of the room, never more than its bed count.
+        """
+        self._lock_for_booking()
+        booked = self._update_booked_beds(count, condition="""
+            AND state IN ('available', 'partially_booked')
+            AND booked_beds + %(delta)s <= bed_count
+        """)
+        if booked is None:
+            raise ValidationError("This room is fully booked.")
+        return booked
+
+    def _release_beds(self, count=1):
+        """
+        Free `count` beds of the room.
+        """
+        self._lock_for_booking()
+        return self._update_booked_beds(-count)
+
+    # ==========================
+    # BED RECONCILIATION
+    # ==========================
+    @api.model
+    def _get_booked_beds_drift(self, clinic_id):
+        """
+        Rooms of the clinic whose booked beds don't match their in progress admissions,
+        counted with a single GROUP BY.
+
+        :return: {room_id: (stored booked beds, in progress admissions)}
+        """
+        self.env.cr.execute("""
+            SELECT room.id, room.booked_beds, COUNT(admission.id)
+              FROM room
+         LEFT JOIN patient_admission admission
+                ON admission.room_id = room.id AND admission.state = 'in_progress'
+             WHERE room.clinic_id = %s
+          GROUP BY room.id
+            HAVING room.booked_beds != COUNT(admission.id)
+        """, [clinic_id])
+        return {room_id: (stored, actual) for room_id, stored, actual in self.env.cr.fetchall()}
+
+    @api.model
+    def _reconcile_booked_beds(self, clinic_ids=None):
+        """
+        Recompute the booked beds of the rooms from their in progress admissions, clinic by clinic,
+        and fix the drifting rooms with one UPDATE per clinic.
+        A room booked or released since its drift was read is left for the next run.
+
+        :param clinic_ids: clinics to check, all of them by default.
+        :return: {room_id: (stored booked beds, in progress admissions)} of the drifting rooms.
+        """
+        self.env['patient.admission'].flush_model(['room_id', 'state'])
+        self.flush_model(['clinic_id', 'bed_count', 'booked_beds', 'state'])
+        if clinic_ids is None:
+            clinic_ids = self.env['clinic'].sudo().with_context(active_test=False).search([]).ids
+
+        drift = {}
+        for clinic_id in clinic_ids:
+            clinic_drift = self._get_booked_beds_drift(clinic_id)
+            if not clinic_drift:
+                continue
+            _logger.warning(
+                "Booked beds drift in clinic %s (room: stored, actual): %s", clinic_id, clinic_drift
+            )
+            room_ids, stored, actual = zip(*((room_id, *counts) for room_id, counts in clinic_drift.items()))
+            booked = "fix.booked"
+            self.env.cr.execute(f"""
+                UPDATE room
+                   SET booked_beds = {booked},
+                       available_beds = bed_count - {booked},
+                       state = {BED_STATE_SQL.format(booked=booked)},
+                       write_uid = %(uid)s,
+                       write_date = (now() at time zone 'UTC')
+                  FROM unnest(%(room_ids)s, %(stored)s, %(actual)s) AS fix(room_id, stored, booked)
+                 WHERE room.id = fix.room_id AND room.booked_beds = fix.stored
+            """, {'uid': self.env.uid, 'room_ids': list(room_ids), 'stored': list(stored), 'actual': list(actual)})
+            drift.update(clinic_drift)
+
+        if drift:
+            rooms = self.browse(drift)
+            rooms.invalidate_recordset(['booked_beds', 'available_beds', 'state', 'write_uid', 'write_date'])
+            rooms._refresh_bed_availability()
+        return drift
+
+    @api.model
+    def _cron_reconcile_booked_beds(self):
+        self._reconcile_booked_beds()
+
     # ==========================
     # WORKFLOW ACTIONS
     # ==========================
@@ -175,12 +405,24 @@ class Room(models.Model):
     # ==========================
     # OVERRIDES
     # ==========================
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """
         Overrides create method to generate a unique sequence number for 'name'
         if it's not provided.
         """
-        if vals.get('name', 'New') == 'New':
-            vals['name'] = self.env['ir.sequence'].next_by_code('room.sequence') or 'New'
-        return super().create(vals)
+        self.env['ir.sequence']._assign_batch_names(vals_list, 'room.sequence')
+        rooms = super().create(vals_list)
+        rooms._refresh_bed_availability()
+        return rooms
+
+    def write(self, vals):
+        """
+        Keeps the bed availability in sync when the grouping or the capacity of rooms changes.
+        """
+        if not AVAILABILITY_FIELDS.intersection(vals):
+            return super().write(vals)
+        old_keys = self._get_availability_keys()
+        res = super().write(vals)
+        self._refresh_bed_availability(old_keys)
+        return res
@@ -0,0 +1,179 @@
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+
+BOOKABLE_ROOM_STATES = ('available', 'partially_booked', 'fully_booked')
+
+
+class RoomAvailability(models.Model):
+    _name = 'room.availability'
+    _description = 'Bed Availability'
+    _order = 'clinic_id, room_type, service_set_key'
+
+    # ==========================
+    # FIELDS
+    # ==========================
+    clinic_id = fields.Many2one(
+        'clinic',
+        string='Clinic',
+        required=True,
+        readonly=True,
+        ondelete='cascade',
+        help="Clinic of the rooms counted in this line."
+    )
+
+    room_type = fields.Selection([
+        ('standard', 'Standard'),
+        ('private', 'Private')
+    ], string='Room Type', required=True, readonly=True, help="Type of the rooms counted in this line.")
+
+    service_set_key = fields.Char(
+        string='Basic Services Key',
+        required=True,
+        readonly=True,
+        help="Sorted ids of the basic services shared by the rooms of this line."
+    )
+
+    free_beds = fields.Integer(
+        string='Free Beds',
+        readonly=True,
+        help="Beds that can still be booked in the bookable rooms of this line."
+    )
+
+    room_count = fields.Integer(
+        string='Rooms',
+        readonly=True,
+        help="Number of bookable rooms (available, partially or fully booked) of this line."
+    )
+
+    _sql_constraints = [
+        ('availability_key_unique', 'UNIQUE(clinic_id, room_type, service_set_key)',
+         'There can only be one availability line per clinic, room type and service set.'),
+    ]
+
+    # ==========================
+    # MAINTENANCE
+    # ==========================
+    @api.model
+    def _refresh(self, keys):
+        """
+        Recompute the lines of the given (clinic_id, room_type, service_set_key) keys
+        from their rooms with a single upsert.
+        """
+        keys = [key for key in keys if all(key)]
+        if not keys:
+            return
+        self.env['room'].flush_model(['clinic_id', 'room_type', 'service_set_key', 'available_beds', 'state'])
+        clinic_ids, room_types, service_set_keys = zip(*keys)
+        self.env.cr.execute("""
+            INSERT INTO room_availability (clinic_id, room_type, service_set_key, free_beds, room_count,
+                                           create_uid, create_date, write_uid, write_date)
+                 SELECT k.clinic_id, k.room_type, k.service_set_key,
+                        COALESCE(SUM(r.available_beds) FILTER (WHERE r.state IN ('available', 'partially_booked')), 0),
+                        COUNT(r.id) FILTER (WHERE r.state IN %(bookable)s),
+                        %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+                   FROM unnest(%(clinic_ids)s::int[], %(room_types)s::varchar[], %(service_set_keys)s::varchar[])
+                        AS k(clinic_id, room_type, service_set_key)
+              LEFT JOIN room r ON r.clinic_id = k.clinic_id
+                              AND r.room_type = k.room_type
+                              AND r.service_set_key = k.service_set_key
+               GROUP BY k.clinic_id, k.room_type, k.service_set_key
+            ON CONFLICT (clinic_id, room_type, service_set_key) DO UPDATE
+                    SET free_beds = EXCLUDED.free_beds,
+                        room_count = EXCLUDED.room_count,
+                        write_uid = EXCLUDED.write_uid,
+                        write_date = EXCLUDED.write_date
+        """, {
+            'bookable': BOOKABLE_ROOM_STATES,
+            'uid': self.env.uid,
+            'clinic_ids': list(clinic_ids),
+            'room_types': list(room_types),
+            'service_set_keys': list(service_set_keys),
+        })
+        self.invalidate_model(['free_beds', 'room_count', 'write_uid', 'write_date'])
+
+    @api.model
+    def _rebuild(self):
+        """Rebuild every line from the rooms table."""
+        self.env['room'].flush_model(['clinic_id', 'room_type', 'service_set_key'])
+        self.env.cr.execute("SELECT DISTINCT clinic_id, room_type, service_set_key FROM room")
+        self._refresh(self.env.cr.fetchall())
+
+    @api.model
+    def _schedule_refresh(self):
+        """
+        Have the lines rebuilt by the refresh cron right after the current transaction.
+        Bookings don't write the lines themselves: two bookings in rooms of the same line
+        would otherwise conflict on it.
+        """
+        self.env.ref('hms_rooms.ir_cron_room_availability_refresh').sudo()._trigger()
+
+    @api.model
+    def _cron_refresh(self):
+        self._rebuild()
+
+    # ==========================
+    # API
+    # ==========================
+    @api.model
+    def find_available_beds(self, clinic_id, room_type, service_ids=None, count=1, admissions=None):
+        """
+        Find `count` free beds in the clinic for a room type and a set of basic services.
+        The availability line answers whether enough beds are free without scanning rooms,
+        then at most `count` rooms are fetched, fullest availability first.
+        Lines follow bookings asynchronously, the rooms themselves are read with their live counts.
+
+        When `admissions` are given, one bed is reserved for each of them: they are placed in
+        the returned rooms and confirmed, which claims their bed slots and books the beds
+        under the lock of each room. The beds are released by discharging the admissions.
+
+        :param clinic_id: clinic id.
+        :param room_type: 'standard' or 'private'.
+        :param service_ids: ids of the basic services the rooms must have (exact set).
+        :param count: number of beds needed, the number of admissions when they are given.
+        :param admissions: draft `patient.admission` records to place, optional.
+        :return: list of {'room_id': id, 'beds': n}, empty when not enough beds are free.
+        """
+        if admissions:
+            admissions._check_state_transition('draft')
+            if admissions.filtered('bed_slot_ids'):
+                raise ValidationError("A bed is already reserved for this admission.")
+            if admissions.filtered(lambda rec: rec.room_type != room_type):
+                raise ValidationError("The admissions must be for the requested room type.")
+            count = len(admissions)
+
+        Room = self.env['room']
+        service_set_key = Room._get_service_set_key(service_ids or [])
+        availability = self.search([
+            ('clinic_id', '=', clinic_id),
+            ('room_type', '=', room_type),
+            ('service_set_key', '=', service_set_key),
+        ], limit=1)
+        if availability.free_beds < count:
+            return []
+
+        rooms = Room.search([
+            ('clinic_id', '=', clinic_id),
+            ('room_type', '=', room_type),
+            ('service_set_key', '=', service_set_key),
+            ('state', 'in', ['available', 'partially_booked']),
+            ('available_beds', '>', 0),
+        ], order='available_beds desc, id', limit=count)
+
+        allocation = []
+        remaining = count
+        for room in rooms:
+            beds = min(room.available_beds, remaining)
+            allocation.append({'room_id': room.id, 'beds': beds})
+            remaining -= beds
+            if not remaining:
+                break
+        else:
+            return []
+
+        if admissions:
+            to_place = admissions
+            for line in allocation:
+                to_place[:line['beds']].write({'room_id': line['room_id']})
+                to_place = to_place[line['beds']:]
+            admissions.action_confirm()
+        return allocation
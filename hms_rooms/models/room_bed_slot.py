@@ -0,0 +1,91 @@
+from odoo import models, fields, api
+from odoo.tools.sql import create_index
+
+# Half-open occupancy range of a slot, an open slot runs until discharge
+SLOT_RANGE_SQL = "tsrange(start_date, COALESCE(stop_date, 'infinity'::timestamp), '[)')"
+
+
+class RoomBedSlot(models.Model):
+    _name = 'room.bed.slot'
+    _description = 'Room Bed Slot'
+    _order = 'start_date, id'
+
+    # ==========================
+    # FIELDS
+    # ==========================
+    room_id = fields.Many2one(
+        'room',
+        string='Room',
+        required=True,
+        index=True,
+        ondelete='cascade',
+        help="Room in which one bed is held."
+    )
+
+    admission_id = fields.Many2one(
+        'patient.admission',
+        string='Admission',
+        index=True,
+        ondelete='cascade',
+        help="Admission holding the bed."
+    )
+
+    start_date = fields.Datetime(
+        string='From',
+        required=True,
+        help="Start of the bed occupancy."
+    )
+
+    stop_date = fields.Datetime(
+        string='To',
+        help="End of the bed occupancy, empty while the patient stays."
+    )
+
+    _sql_constraints = [
+        ('slot_dates_check', 'CHECK(stop_date IS NULL OR stop_date > start_date)',
+         'The end of a bed slot must be after its start.'),
+    ]
+
+    def init(self):
+        # overlap lookups on the occupancy range
+        create_index(self.env.cr, 'room_bed_slot_range_index', self._table, [SLOT_RANGE_SQL], method='gist')
+
+    # ==========================
+    # OCCUPANCY
+    # ==========================
+    @api.model
+    def _get_peak_occupancy(self, room_ids, start, stop=None):
+        """
+        Highest number of beds held at the same time in each room during [start, stop).
+        Only the slots overlapping the window are read (GiST range index), then a
+        sweep over their start/stop events gives the peak.
+
+        :return: {room_id: peak occupied beds}
+        """
+        self.flush_model(['room_id', 'start_date', 'stop_date'])
+        self.env.cr.execute(f"""
+            WITH slots AS (
+                SELECT room_id,
+                       GREATEST(start_date, %(start)s) AS slot_start,
+                       LEAST(COALESCE(stop_date, 'infinity'::timestamp), %(stop)s) AS slot_stop
+                  FROM room_bed_slot
+                 WHERE room_id = ANY(%(room_ids)s)
+                   AND {SLOT_RANGE_SQL} && tsrange(%(start)s, %(stop)s, '[)')
+            ), events AS (
+                SELECT room_id, slot_start AS at, 1 AS delta FROM slots
+                 UNION ALL
+                SELECT room_id, slot_stop AS at, -1 AS delta FROM slots
+            )
+            SELECT room_id, MAX(occupied)
+              FROM (
+                  -- a bed freed at t can be taken at t: stops are counted before starts
+                  SELECT room_id, SUM(delta) OVER (PARTITION BY room_id ORDER BY at, delta ROWS UNBOUNDED PRECEDING) AS occupied
+                    FROM events
+              ) sweep
+          GROUP BY room_id
+        """, {
+            'room_ids': list(room_ids),
+            'start': start,
+            'stop': stop or 'infinity',
+        })
+        return dict(self.env.cr.fetchall())
@@ -3,6 +3,7 @@ from odoo import models, fields, api
 class RoomService(models.Model):
     _name = 'room.service'
     _description = 'Hospital Room Service'
+    _rec_names_search = ['display_name']
 
     # ==========================
     # FIELDS
@@ -25,6 +26,7 @@ class RoomService(models.Model):
         string="Display Name",
         compute='_compute_display_name',
         store=True,
+        index='trigram',
         help="Name shown in selection fields instead of sequence."
     )
 
@@ -51,7 +53,7 @@ class RoomService(models.Model):
     # ==========================
     # COMPUTE METHODS
     # ==========================
-    @api.depends('service_name')
+    @api.depends('service_name', 'name')
     def _compute_display_name(self):
         for rec in self:
             rec.display_name = rec.service_name or rec.name
@@ -60,11 +62,10 @@ class RoomService(models.Model):
     # ==========================
     # OVERRIDES
     # ==========================
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """
         Override create method to generate a unique sequence for 'name'.
         """
-        if vals.get('name', 'New') == 'New':
-            vals['name'] = self.env['ir.sequence'].next_by_code('room.service') or 'New'
-        return super(RoomService, self).create(vals)
+        self.env['ir.sequence']._assign_batch_names(vals_list, 'room.service')
+        return super(RoomService, self).create(vals_list)
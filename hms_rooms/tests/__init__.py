@@ -1,3 +1,10 @@
 from . import test_room
 from . import test_service
 from . import test_patient_admission
+from . import test_bed_booking
+from . import test_bulk_admission
+from . import test_room_availability
+from . import test_bed_slot
+from . import test_occupancy_analytics
+from . import test_appointment
+from . import test_discharge_invoicing
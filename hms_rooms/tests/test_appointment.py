@@ -0,0 +1,58 @@
+from odoo.tests.common import TransactionCase
+
+
+class TestAppointment(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.patients = self.env['patient'].create([{
+            'name': f'Patient {i}',
+            'user_id': self.env['res.users'].create({'name': f'Patient {i}', 'login': f'appointment_patient_{i}'}).id,
+        } for i in range(2)])
+        clinic = self.env['clinic'].create({'name': 'Test Clinic'})
+        room = self.env['room'].create({'room_type': 'standard', 'clinic_id': clinic.id, 'bed_count': 5})
+        self.env['patient.admission'].create({
+            'patient_id': self.patients[0].id,
+            'room_id': room.id,
+            'room_type': 'standard',
+        })
+
+    def _create_appointments(self, count):
+        return self.env['appointment'].create([
+            {'patient_id': self.patients[i % 2].id} for i in range(count)
+        ])
+
+    def test_flag_book_room(self):
+        """
+        Test that the flag is set for patients having an active admission,
+        and for draft and cancelled appointments.
+        """
+        states = [value for value, _label in self.env['appointment']._fields['state']._description_selection(self.env)]
+        open_state = next(state for state in states if state not in ('draft', 'done', 'cancelled'))
+        admitted, not_admitted, cancelled, draft = self.env['appointment'].create([
+            {'patient_id': self.patients[0].id, 'state': open_state},
+            {'patient_id': self.patients[1].id, 'state': open_state},
+            {'patient_id': self.patients[1].id, 'state': 'cancelled'},
+            {'patient_id': self.patients[1].id, 'state': 'draft'},
+        ])
+        self.assertEqual(admitted.state, open_state)
+        self.assertTrue(admitted.flag_book_room)
+        self.assertFalse(not_admitted.flag_book_room)
+        self.assertTrue(cancelled.flag_book_room)
+        self.assertTrue(draft.flag_book_room)
+
+    def _count_compute_queries(self, appointments):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        appointments.mapped('state')
+        appointments.mapped('patient_id')
+        start = self.env.cr.sql_log_count
+        appointments.mapped('flag_book_room')
+        return self.env.cr.sql_log_count - start
+
+    def test_flag_book_room_one_query_per_page(self):
+        """
+        Test that computing the flag runs a single query whatever the number of appointments.
+        """
+        self.assertEqual(self._count_compute_queries(self._create_appointments(2)), 1)
+        self.assertEqual(self._count_compute_queries(self._create_appointments(40)), 1)
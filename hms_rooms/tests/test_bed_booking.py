@@ -0,0 +1,133 @@
+import threading
+import time
+
+from psycopg2.errors import LockNotAvailable, SerializationFailure
+
+from odoo import SUPERUSER_ID, api
+from odoo.exceptions import ValidationError
+from odoo.modules.registry import Registry
+from odoo.tests import tagged
+from odoo.tests.common import BaseCase, get_db_name
+
+
+@tagged('-standard', 'hms_benchmark')
+class TestBedBookingConcurrency(BaseCase):
+    """
+    Confirms admissions from parallel workers, each with its own committed transaction.
+    """
+
+    BED_COUNT = 10
+    ADMISSIONS = 30
+    # scaling case: one room per worker, each room booked once serially and once in parallel
+    ROOMS = 4
+    ROOM_ADMISSIONS = 10
+
+    def setUp(self):
+        super().setUp()
+        self.registry = Registry(get_db_name())
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            user = env['res.users'].create({'name': 'Stress Patient', 'login': 'stress_patient'})
+            patient = env['patient'].create({'name': 'Stress Patient', 'user_id': user.id})
+            clinic = env['clinic'].create({'name': 'Stress Clinic'})
+            room = env['room'].create({'room_type': 'standard', 'clinic_id': clinic.id, 'bed_count': self.BED_COUNT})
+            admissions = env['patient.admission'].create([{
+                'patient_id': patient.id,
+                'room_id': room.id,
+                'room_type': 'standard',
+            } for _i in range(self.ADMISSIONS)])
+            rooms = env['room'].create([{
+                'room_type': 'standard',
+                'clinic_id': clinic.id,
+                'bed_count': 2 * self.ROOM_ADMISSIONS,
+            } for _i in range(self.ROOMS)])
+            # per run, the admissions of each room: [[room 1 admissions], [room 2 admissions], ...]
+            runs = [[env['patient.admission'].create([{
+                'patient_id': patient.id,
+                'room_id': spread_room.id,
+                'room_type': 'standard',
+            } for _i in range(self.ROOM_ADMISSIONS)]).ids for spread_room in rooms] for _run in range(2)]
+            self.ids = {'user': user.id, 'patient': patient.id, 'clinic': clinic.id,
+                        'room': room.id, 'admissions': admissions.ids,
+                        'rooms': rooms.ids, 'runs': runs}
+        self.addCleanup(self._cleanup)
+
+    def _cleanup(self):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            env['patient.admission'].browse(self.ids['admissions']).unlink()
+            env['patient.admission'].browse([a for run in self.ids['runs'] for chunk in run for a in chunk]).unlink()
+            env['room'].browse([self.ids['room']] + self.ids['rooms']).unlink()
+            env['clinic'].browse(self.ids['clinic']).unlink()
+            env['patient'].browse(self.ids['patient']).unlink()
+            env['res.users'].browse(self.ids['user']).unlink()
+
+    def _confirm(self, admission_id, results):
+        # like the HTTP layer, retry the transaction on concurrency errors, with enough
+        # attempts that every worker ends up booked or refused
+        for attempt in range(1, 31):
+            try:
+                with self.registry.cursor() as cr:
+                    env = api.Environment(cr, SUPERUSER_ID, {})
+                    env['patient.admission'].browse(admission_id).action_confirm()
+                results.append('booked')
+                return
+            except (LockNotAvailable, SerializationFailure):
+                time.sleep(0.01 * attempt)
+            except ValidationError:
+                results.append('full')
+                return
+        results.append('failed')
+
+    def _run_workers(self, admission_ids, workers):
+        return self._run_chunks([admission_ids[i::workers] for i in range(workers)])
+
+    def _run_chunks(self, chunks):
+        """Confirm each chunk of admissions in its own thread."""
+        results = []
+        threads = [
+            threading.Thread(target=lambda chunk=chunk: [self._confirm(a, results) for a in chunk])
+            for chunk in chunks
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, time.perf_counter() - start
+
+    def test_parallel_confirm_never_overbooks(self):
+        """
+        N parallel confirmations must book exactly the bed count of the room.
+        """
+        results, duration = self._run_workers(self.ids['admissions'], workers=8)
+
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            room = env['room'].browse(self.ids['room'])
+            self.assertEqual(results.count('failed'), 0)
+            self.assertEqual(results.count('booked'), self.BED_COUNT)
+            self.assertEqual(results.count('full'), self.ADMISSIONS - self.BED_COUNT)
+            self.assertEqual(room.booked_beds, self.BED_COUNT)
+            self.assertEqual(room.state, 'fully_booked')
+            self.assertEqual(
+                env['patient.admission'].search_count([('room_id', '=', room.id), ('state', '=', 'in_progress')]),
+                self.BED_COUNT,
+            )
+        self.assertLess(duration, 30, f"{self.ADMISSIONS} confirmations took {duration:.2f}s")
+
+    def test_throughput_scales_with_workers(self):
+        """
+        Workers booking different rooms don't wait on each other's room lock: confirming the same
+        number of admissions spread over ROOMS rooms is faster with one worker per room than with one worker.
+        """
+        serial_run, parallel_run = self.ids['runs']
+        serial_results, serial = self._run_chunks([[a for chunk in serial_run for a in chunk]])
+        parallel_results, parallel = self._run_chunks(parallel_run)
+
+        total = self.ROOMS * self.ROOM_ADMISSIONS
+        self.assertEqual(serial_results.count('booked'), total)
+        self.assertEqual(parallel_results.count('booked'), total)
+        self.assertLess(parallel, serial,
+                        f"{total} confirmations took {serial:.2f}s with 1 worker, "
+                        f"{parallel:.2f}s with {self.ROOMS} workers")
@@ -0,0 +1,107 @@
+import time
+from datetime import datetime, timedelta
+
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+class TestBedSlot(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        user = self.env['res.users'].create({'name': 'Patient User', 'login': 'slot_patient_user'})
+        self.patient = self.env['patient'].create({'name': 'Test Patient', 'user_id': user.id})
+        clinic = self.env['clinic'].create({'name': 'Test Clinic'})
+        self.room = self.env['room'].create({'room_type': 'standard', 'clinic_id': clinic.id, 'bed_count': 2})
+        self.day = datetime(2030, 1, 1)
+
+    def _admission(self, start_hour, stop_hour):
+        return self.env['patient.admission'].create({
+            'patient_id': self.patient.id,
+            'room_id': self.room.id,
+            'room_type': 'standard',
+            'admission_date': self.day + timedelta(hours=start_hour),
+            'expected_discharge_date': self.day + timedelta(hours=stop_hour),
+        })
+
+    def _free(self, start_hour, stop_hour):
+        return self.room._get_free_capacity(
+            self.day + timedelta(hours=start_hour), self.day + timedelta(hours=stop_hour)
+        )[self.room.id]
+
+    def test_free_capacity_over_window(self):
+        """
+        Test that the free capacity is based on the peak of overlapping slots.
+        """
+        self._admission(8, 12).action_schedule()
+        self._admission(12, 16).action_schedule()  # back to back with the first one
+
+        self.assertEqual(self._free(0, 8), 2)
+        self.assertEqual(self._free(0, 24), 1)
+
+        self._admission(10, 14).action_schedule()
+        self.assertEqual(self._free(9, 11), 0)
+        self.assertEqual(self._free(16, 20), 2)
+
+    def test_expected_discharge_before_start(self):
+        """
+        Test that stays ending before they start are refused with a clear error.
+        """
+        with self.assertRaises(ValidationError):
+            self._admission(12, 8)
+
+        admission = self.env['patient.admission'].create({
+            'patient_id': self.patient.id,
+            'room_id': self.room.id,
+            'room_type': 'standard',
+            'expected_discharge_date': datetime.now() - timedelta(hours=1),
+        })
+        with self.assertRaises(ValidationError):
+            admission.action_confirm()
+        self.assertFalse(admission.bed_slot_ids)
+
+    def test_overbooking_refused(self):
+        """
+        Test that a pre-booking is refused when the room is full during the window.
+        """
+        self._admission(8, 12).action_schedule()
+        self._admission(9, 10).action_schedule()
+        with self.assertRaises(ValidationError):
+            self._admission(9, 11).action_schedule()
+        self._admission(10, 13).action_schedule()
+
+    def test_cancel_frees_slot(self):
+        admission = self._admission(8, 12)
+        admission.action_schedule()
+        admission.action_set_cancelled()
+        self.assertEqual(self._free(8, 12), 2)
+
+
+@tagged('-standard', 'hms_benchmark')
+class TestBedSlotBenchmark(TransactionCase):
+
+    def test_occupancy_over_100k_admissions(self):
+        """
+        Query the free capacity of a week over 100k historical stays spread on 200 rooms.
+        """
+        clinic = self.env['clinic'].create({'name': 'Benchmark Clinic'})
+        rooms = self.env['room'].create([
+            {'room_type': 'standard', 'clinic_id': clinic.id, 'bed_count': 4} for _i in range(200)
+        ])
+        self.env.flush_all()
+        self.env.cr.execute("""
+            INSERT INTO room_bed_slot (room_id, start_date, stop_date)
+                 SELECT (%(room_ids)s::int[])[1 + i %% 200],
+                        timestamp '2020-01-01' + i * interval '25 minutes',
+                        timestamp '2020-01-01' + i * interval '25 minutes' + interval '3 days'
+                   FROM generate_series(0, 99999) AS i
+        """, {'room_ids': rooms.ids})
+        self.env.cr.execute("ANALYZE room_bed_slot")
+
+        start = time.perf_counter()
+        capacity = rooms._get_free_capacity(datetime(2022, 6, 1), datetime(2022, 6, 8))
+        duration = time.perf_counter() - start
+
+        self.assertEqual(len(capacity), 200)
+        self.assertLess(duration, 1, f"occupancy query took {duration:.3f}s")
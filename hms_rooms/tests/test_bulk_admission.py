@@ -0,0 +1,131 @@
+import time
+from datetime import datetime, timedelta
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+class TestBulkAdmission(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.clinic = self.env['clinic'].create({'name': 'Test Clinic'})
+        self.patients = self.env['patient'].create([{
+            'name': f'Patient {i}',
+            'user_id': self.env['res.users'].create({'name': f'Patient {i}', 'login': f'bulk_patient_{i}'}).id,
+        } for i in range(2)])
+        self.rooms = self.env['room'].create([{
+            'room_type': 'standard',
+            'clinic_id': self.clinic.id,
+            'bed_count': 3,
+            'base_hourly_price': 10.0,
+        } for _i in range(2)])
+
+    def _create_admissions(self):
+        return self.env['patient.admission'].create([{
+            'patient_id': self.patients[i % 2].id,
+            'room_id': self.rooms[i % 2].id,
+            'room_type': 'standard',
+            'admission_date': datetime.now() - timedelta(hours=2),
+        } for i in range(4)])
+
+    def test_bulk_confirm_and_discharge(self):
+        """
+        Test confirming and discharging several admissions at once.
+        """
+        admissions = self._create_admissions()
+
+        admissions.action_confirm()
+        self.assertEqual(set(admissions.mapped('state')), {'in_progress'})
+        self.assertEqual(self.rooms.mapped('booked_beds'), [2, 2])
+        self.assertEqual(set(self.rooms.mapped('state')), {'partially_booked'})
+
+        admissions.action_discharge()
+        self.assertEqual(set(admissions.mapped('state')), {'discharged'})
+        self.assertEqual(self.rooms.mapped('booked_beds'), [0, 0])
+        self.assertEqual(set(self.rooms.mapped('state')), {'available'})
+
+        # stay charges are staged, the invoices are only written by the materialization
+        charges = self.env['hms.charge'].search([('patient_id', 'in', self.patients.ids)])
+        self.assertEqual((len(charges), set(charges.mapped('state'))), (4, {'pending'}))
+        self.assertFalse(self.env['account.move'].search([('patient_id', 'in', self.patients.ids)]))
+
+        self.env['hms.charge']._cron_materialize_charges()
+        invoices = self.env['account.move'].search([('patient_id', 'in', self.patients.ids)])
+        self.assertEqual(len(invoices), 2)
+        self.assertEqual(len(invoices.invoice_line_ids), 4)
+
+
+@tagged('-standard', 'hms_benchmark')
+class TestBulkAdmissionBenchmark(TransactionCase):
+
+    def test_bulk_confirm_discharge_1k(self):
+        """
+        Confirm and discharge 1k admissions spread over 50 rooms and 100 patients.
+        """
+        clinic = self.env['clinic'].create({'name': 'Benchmark Clinic'})
+        patients = self.env['patient'].create([{
+            'name': f'Patient {i}',
+            'user_id': self.env['res.users'].create({'name': f'Patient {i}', 'login': f'bench_patient_{i}'}).id,
+        } for i in range(100)])
+        rooms = self.env['room'].create([{
+            'room_type': 'standard',
+            'clinic_id': clinic.id,
+            'bed_count': 20,
+            'base_hourly_price': 10.0,
+        } for _i in range(50)])
+        admissions = self.env['patient.admission'].create([{
+            'patient_id': patients[i % 100].id,
+            'room_id': rooms[i % 50].id,
+            'room_type': 'standard',
+            'admission_date': datetime.now() - timedelta(hours=2),
+        } for i in range(1000)])
+
+        start = time.perf_counter()
+        admissions.action_confirm()
+        admissions.action_discharge()
+        self.env['hms.charge']._cron_materialize_charges()
+        self.env.flush_all()
+        duration = time.perf_counter() - start
+
+        self.assertEqual(sum(rooms.mapped('booked_beds')), 0)
+        self.assertLess(duration, 120, f"1k admissions took {duration:.2f}s")
+
+    def test_create_10k_rooms(self):
+        """
+        Import 10k rooms in one create, their names reserved as one block of the sequence.
+        """
+        clinic = self.env['clinic'].create({'name': 'Benchmark Clinic'})
+
+        start = time.perf_counter()
+        rooms = self.env['room'].create([{
+            'room_type': 'standard',
+            'clinic_id': clinic.id,
+            'bed_count': 2,
+        } for _i in range(10000)])
+        self.env.flush_all()
+        duration = time.perf_counter() - start
+
+        self.assertEqual(len(set(rooms.mapped('name'))), 10000)
+        self.assertLess(duration, 120, f"10k rooms took {duration:.2f}s")
+
+    def test_create_10k_admissions(self):
+        """
+        Import 10k admissions in one create, their names reserved as one block of the sequence.
+        """
+        clinic = self.env['clinic'].create({'name': 'Benchmark Clinic'})
+        user = self.env['res.users'].create({'name': 'Patient', 'login': 'bench_import_patient'})
+        patient = self.env['patient'].create({'name': 'Patient', 'user_id': user.id})
+        room = self.env['room'].create({'room_type': 'standard', 'clinic_id': clinic.id, 'bed_count': 1})
+
+        start = time.perf_counter()
+        admissions = self.env['patient.admission'].create([{
+            'patient_id': patient.id,
+            'room_id': room.id,
+            'room_type': 'standard',
+        } for _i in range(10000)])
+        self.env.flush_all()
+        duration = time.perf_counter() - start
+
+        self.assertEqual(len(set(admissions.mapped('name'))), 10000)
+        self.assertLess(duration, 120, f"10k admissions took {duration:.2f}s")
@@ -0,0 +1,116 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from psycopg2.errors import LockNotAvailable, SerializationFailure
+
+from odoo import SUPERUSER_ID, api
+from odoo.modules.registry import Registry
+from odoo.tests import tagged
+from odoo.tests.common import BaseCase, get_db_name
+
+
+@tagged('-standard', 'hms_benchmark')
+class TestDischargeInvoicingConcurrency(BaseCase):
+    """
+    Discharges admissions of one patient and materializes their staged charges while room service
+    and appointment charges are billed, from parallel workers each with its own committed transaction.
+    """
+
+    ADMISSIONS = 5
+    CHARGES = 5
+
+    def setUp(self):
+        super().setUp()
+        self.registry = Registry(get_db_name())
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            user = env['res.users'].create({'name': 'Concurrent Patient', 'login': 'concurrent_patient'})
+            patient = env['patient'].create({'name': 'Concurrent Patient', 'user_id': user.id})
+            clinic = env['clinic'].create({'name': 'Concurrent Clinic'})
+            room = env['room'].create({
+                'room_type': 'standard',
+                'clinic_id': clinic.id,
+                'bed_count': self.ADMISSIONS,
+                'base_hourly_price': 10.0,
+            })
+            admissions = env['patient.admission'].create([{
+                'patient_id': patient.id,
+                'room_id': room.id,
+                'room_type': 'standard',
+                'admission_date': datetime.now() - timedelta(hours=2),
+            } for _i in range(self.ADMISSIONS)])
+            admissions.action_confirm()
+            self.ids = {'user': user.id, 'partner': user.partner_id.id, 'patient': patient.id,
+                        'clinic': clinic.id, 'room': room.id, 'admissions': admissions.ids}
+        self.addCleanup(self._cleanup)
+
+    def _cleanup(self):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            env['hms.charge'].search([('patient_id', '=', self.ids['patient'])]).unlink()
+            env['account.move'].search([('partner_id', '=', self.ids['partner'])]).unlink()
+            env['patient.admission'].browse(self.ids['admissions']).unlink()
+            env['room'].browse(self.ids['room']).unlink()
+            env['clinic'].browse(self.ids['clinic']).unlink()
+            env['patient'].browse(self.ids['patient']).unlink()
+            env['res.users'].browse(self.ids['user']).unlink()
+
+    def _run(self, job, results):
+        # like the HTTP layer, retry the transaction on concurrency errors
+        for attempt in range(1, 31):
+            try:
+                with self.registry.cursor() as cr:
+                    job(api.Environment(cr, SUPERUSER_ID, {}))
+                results.append('done')
+                return
+            except (LockNotAvailable, SerializationFailure):
+                time.sleep(0.01 * attempt)
+        results.append('failed')
+
+    def test_parallel_discharges_and_charges_share_one_draft(self):
+        """
+        Discharges, charge materializations, room service and appointment charges of one patient
+        billed at the same time must all land on a single draft invoice, each charge once.
+        """
+        patient_id = self.ids['patient']
+        jobs = [
+            lambda env, admission_id=admission_id: env['patient.admission'].browse(admission_id).action_discharge()
+            for admission_id in self.ids['admissions']
+        ]
+        for kind in ('Room Service', 'Appointment'):
+            jobs += [
+                lambda env, name=f"{kind} {i}": env['invoice.service'].add_invoice_items(
+                    patient_id, [{'name': name, 'quantity': 1.0, 'price_unit': 10.0}]
+                )
+                for i in range(self.CHARGES)
+            ]
+        jobs += [lambda env: env['hms.charge']._cron_materialize_charges() for _i in range(self.CHARGES)]
+
+        results = []
+        threads = [threading.Thread(target=self._run, args=(job, results)) for job in jobs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count('done'), len(jobs))
+        # charges staged after the last materialization job, as the triggered cron would
+        self._run(lambda env: env['hms.charge']._cron_materialize_charges(), results)
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            self.assertEqual(
+                set(env['patient.admission'].browse(self.ids['admissions']).mapped('state')), {'discharged'}
+            )
+            invoices = env['account.move'].search([
+                ('partner_id', '=', self.ids['partner']),
+                ('state', '=', 'draft'),
+                ('move_type', '=', 'out_invoice'),
+            ])
+            self.assertEqual(len(invoices), 1)
+            names = invoices.invoice_line_ids.mapped('name')
+            self.assertEqual(len(names), self.ADMISSIONS + 2 * self.CHARGES)
+            self.assertEqual(sum(name.startswith('Room Charge') for name in names), self.ADMISSIONS)
+            self.assertEqual(env['patient'].browse(patient_id).draft_invoice_id, invoices)
+            charges = env['hms.charge'].search([('patient_id', '=', patient_id)])
+            self.assertEqual(set(charges.mapped('state')), {'invoiced'})
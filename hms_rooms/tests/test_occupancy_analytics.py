@@ -0,0 +1,53 @@
+from datetime import date, datetime
+
+from odoo.tests.common import TransactionCase
+
+
+class TestOccupancyAnalytics(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        user = self.env['res.users'].create({'name': 'Patient User', 'login': 'occupancy_patient_user'})
+        patient = self.env['patient'].create({'name': 'Test Patient', 'user_id': user.id})
+        self.clinic = self.env['clinic'].create({'name': 'Test Clinic'})
+        room = self.env['room'].create({'room_type': 'standard', 'clinic_id': self.clinic.id, 'bed_count': 2})
+        self.Analytics = self.env['occupancy.analytics']
+        # 2020-01-01: one stay from 00:00 to 05:00, another from 02:00 to 03:00
+        self.admissions = self.env['patient.admission']
+        for start, stop in [(datetime(2020, 1, 1, 0), datetime(2020, 1, 1, 5)),
+                            (datetime(2020, 1, 1, 2), datetime(2020, 1, 1, 3))]:
+            self.admissions |= self.env['patient.admission'].create({
+                'patient_id': patient.id,
+                'room_id': room.id,
+                'room_type': 'standard',
+                'state': 'discharged',
+                'admission_date': start,
+                'discharge_date': stop,
+            })
+
+    def test_hourly_occupancy(self):
+        """
+        Test hourly buckets, length of stay and turnover of a day.
+        """
+        result = self.Analytics.get_occupancy(date(2020, 1, 1), date(2020, 1, 2), interval='hour',
+                                              clinic_id=self.clinic.id)
+
+        occupied = [bucket['occupied_beds'] for bucket in result['buckets']]
+        self.assertEqual(occupied[:6], [1, 1, 2, 1, 1, 0])
+        self.assertEqual(result['buckets'][2]['occupancy_rate'], 1.0)
+        self.assertEqual(result['average_length_of_stay'], 3.0)
+        self.assertEqual(result['turnover'], 1.0)
+
+    def test_cache_invalidated_on_change(self):
+        """
+        Test that past days are cached and dropped when an admission of that day changes.
+        """
+        Cache = self.env['room.occupancy.day']
+        self.Analytics.get_occupancy('2020-01-01', '2020-01-02', clinic_id=self.clinic.id)
+        self.assertEqual(Cache.search_count([('day', '=', '2020-01-01')]), 1)
+
+        self.admissions[1].discharge_date = datetime(2020, 1, 1, 4)
+        self.assertEqual(Cache.search_count([('day', '=', '2020-01-01')]), 0)
+
+        result = self.Analytics.get_occupancy('2020-01-01', '2020-01-02', clinic_id=self.clinic.id)
+        self.assertEqual(result['average_length_of_stay'], 3.5)
@@ -1,6 +1,8 @@
 from odoo.tests.common import TransactionCase
 from datetime import datetime, timedelta
 
+from odoo.exceptions import ValidationError
+
 class TestPatientAdmission(TransactionCase):
 
     def test_admit_and_discharge_patient(self):
@@ -50,3 +52,76 @@ class TestPatientAdmission(TransactionCase):
         # Check total price (5 hours * (50 base + 10 service))
         expected_price = 5 * (50.0 + 10.0)
         self.assertEqual(admission.total_price, expected_price, "Total price calculation is incorrect")
+
+    def test_confirm_never_overbooks(self):
+        """
+        Test that confirming books one bed and refuses admissions once the room is full.
+        """
+        user = self.env['res.users'].create({'name': 'Patient User', 'login': 'patient_user'})
+        patient = self.env['patient'].create({'name': 'Test Patient', 'user_id': user.id})
+        clinic = self.env['clinic'].create({'name': 'Test Clinic'})
+        room = self.env['room'].create({'room_type': 'standard', 'clinic_id': clinic.id, 'bed_count': 2})
+        admissions = self.env['patient.admission'].create([{
+            'patient_id': patient.id,
+            'room_id': room.id,
+            'room_type': 'standard',
+        } for _i in range(3)])
+
+        admissions[0].action_confirm()
+        self.assertEqual((room.booked_beds, room.available_beds, room.state), (1, 1, 'partially_booked'))
+
+        admissions[1].action_confirm()
+        self.assertEqual((room.booked_beds, room.available_beds, room.state), (2, 0, 'fully_booked'))
+
+        with self.assertRaises(ValidationError):
+            admissions[2].action_confirm()
+        self.assertEqual(room.booked_beds, 2)
+
+    def test_price_snapshot_on_discharge(self):
+        """
+        Test that service price changes reprice the rooms but not the discharged admissions.
+        """
+        user = self.env['res.users'].create({'name': 'Patient User', 'login': 'patient_user'})
+        patient = self.env['patient'].create({'name': 'Test Patient', 'user_id': user.id})
+        clinic = self.env['clinic'].create({'name': 'Test Clinic'})
+        basic_service = self.env['room.service'].create({
+            'service_name': 'Cleaning',
+            'price': 5.0,
+            'service_type': 'basic',
+        })
+        optional_service = self.env['room.service'].create({
+            'service_name': 'Extra Bed',
+            'price': 10.0,
+            'service_type': 'optional',
+        })
+        room = self.env['room'].create({
+            'room_type': 'standard',
+            'clinic_id': clinic.id,
+            'bed_count': 2,
+            'base_hourly_price': 50.0,
+            'basic_service_ids': [(6, 0, [basic_service.id])],
+        })
+        self.assertEqual(room.total_base_hourly_price, 55.0)
+
+        admissions = self.env['patient.admission'].create([{
+            'patient_id': patient.id,
+            'room_id': room.id,
+            'room_type': 'standard',
+            'admission_date': datetime.now() - timedelta(hours=2),
+            'optional_room_service_ids': [(6, 0, [optional_service.id])],
+        } for _i in range(2)])
+        admissions.action_confirm()
+        admissions[0].action_discharge()
+        self.assertEqual(admissions[0].price_snapshot, {'room': 55.0, 'services': {str(optional_service.id): 10.0}})
+
+        basic_service.price = 15.0
+        optional_service.price = 20.0
+        self.assertEqual(room.total_base_hourly_price, 65.0)
+
+        rates = admissions._get_price_rates()
+        self.assertEqual(rates[admissions[0].id]['hourly_rate'], 65.0)
+        self.assertEqual(rates[admissions[1].id]['hourly_rate'], 85.0)
+
+        total_price = admissions[0].total_price
+        admissions[0]._compute_total_price()
+        self.assertEqual(admissions[0].total_price, total_price)
@@ -1,3 +1,6 @@
+import time
+
+from odoo.tests import tagged
 from odoo.tests.common import TransactionCase
 
 class TestRoom(TransactionCase):
@@ -10,3 +13,90 @@ class TestRoom(TransactionCase):
             'base_hourly_price': 50.0,
         })
         self.assertTrue(room.id, "Room should be created successfully")
+
+    def test_reconcile_booked_beds(self):
+        """
+        Test that rooms whose booked beds were written directly are fixed from their admissions.
+        """
+        clinic = self.env['clinic'].create({'name': 'Test Clinic'})
+        user = self.env['res.users'].create({'name': 'Patient User', 'login': 'patient_user'})
+        patient = self.env['patient'].create({'name': 'Test Patient', 'user_id': user.id})
+        rooms = self.env['room'].create([{
+            'room_type': 'standard',
+            'clinic_id': clinic.id,
+            'bed_count': 3,
+        } for _i in range(3)])
+        admissions = self.env['patient.admission'].create([{
+            'patient_id': patient.id,
+            'room_id': rooms[0].id,
+            'room_type': 'standard',
+        } for _i in range(2)])
+        admissions.action_confirm()
+
+        rooms[0].booked_beds = 0
+        rooms[1].booked_beds = 3
+        self.assertEqual(rooms.mapped('available_beds'), [3, 0, 3])
+
+        drift = self.env['room']._reconcile_booked_beds(clinic.ids)
+        self.assertEqual(drift, {rooms[0].id: (0, 2), rooms[1].id: (3, 0)})
+        self.assertEqual(rooms.mapped('booked_beds'), [2, 0, 0])
+        self.assertEqual(rooms.mapped('available_beds'), [1, 3, 3])
+        self.assertEqual(rooms.mapped('state'), ['partially_booked', 'available', 'available'])
+
+        self.assertEqual(self.env['room']._reconcile_booked_beds(clinic.ids), {})
+
+    def test_create_rooms_batch(self):
+        """
+        Test that a batch of rooms gets distinct sequence names from a single reservation.
+        """
+        clinic = self.env['clinic'].create({'name': 'Test Clinic'})
+        rooms = self.env['room'].create([
+            {'room_type': 'standard', 'clinic_id': clinic.id, 'bed_count': 1},
+            {'room_type': 'private', 'clinic_id': clinic.id, 'bed_count': 1, 'name': 'VIP'},
+            {'room_type': 'standard', 'clinic_id': clinic.id, 'bed_count': 1},
+        ])
+        self.assertEqual(rooms[1].name, 'VIP')
+        self.assertNotEqual(rooms[0].name, rooms[2].name)
+        self.assertTrue(all(name.startswith('ROOM') for name in rooms[0::2].mapped('name')))
+
+    def test_name_search_display_name(self):
+        """
+        Test that rooms are found by any part of their display name, including the clinic name.
+        """
+        clinics = self.env['clinic'].create([{'name': 'Cardiology'}, {'name': 'Neurology'}])
+        rooms = self.env['room'].create([{
+            'room_type': room_type,
+            'clinic_id': clinic.id,
+            'bed_count': 1,
+        } for clinic in clinics for room_type in ('standard', 'private')])
+
+        self.assertEqual(rooms[0].display_name, f"{rooms[0].name} — Standard — Cardiology")
+        found = self.env['room'].name_search('Cardiology', limit=10)
+        self.assertEqual({room_id for room_id, _name in found}, set(rooms[:2].ids))
+
+        clinics[1].name = 'Neurosurgery'
+        self.assertEqual(rooms[3].display_name, f"{rooms[3].name} — Private — Neurosurgery")
+
+
+@tagged('-standard', 'hms_benchmark')
+class TestRoomBenchmark(TransactionCase):
+
+    def test_name_search_20k_rooms(self):
+        """
+        Autocomplete of the room selector with 20k rooms.
+        """
+        clinics = self.env['clinic'].create([{'name': f'Benchmark Clinic {i}'} for i in range(20)])
+        self.env['room'].create([{
+            'room_type': 'standard',
+            'clinic_id': clinics[i % 20].id,
+            'bed_count': 1,
+        } for i in range(20000)])
+        self.env.flush_all()
+        self.env.cr.execute("ANALYZE room")
+
+        start = time.perf_counter()
+        found = self.env['room'].name_search('Clinic 7', limit=8)
+        duration = time.perf_counter() - start
+
+        self.assertEqual(len(found), 8)
+        self.assertLess(duration, 0.05, f"name_search took {duration * 1000:.1f}ms")
@@ -0,0 +1,87 @@
+from odoo.exceptions import ValidationError
+from odoo.tests.common import TransactionCase
+
+
+class TestRoomAvailability(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.clinic = self.env['clinic'].create({'name': 'Test Clinic'})
+        self.service = self.env['room.service'].create({
+            'service_name': 'Oxygen',
+            'price': 5.0,
+            'service_type': 'basic',
+        })
+        self.rooms = self.env['room'].create([{
+            'room_type': 'standard',
+            'clinic_id': self.clinic.id,
+            'bed_count': beds,
+            'basic_service_ids': [(6, 0, self.service.ids)],
+        } for beds in (2, 3)])
+        self.Availability = self.env['room.availability']
+
+    def _availability(self):
+        return self.Availability.search([
+            ('clinic_id', '=', self.clinic.id),
+            ('room_type', '=', 'standard'),
+            ('service_set_key', '=', str(self.service.id)),
+        ])
+
+    def test_availability_follows_rooms(self):
+        """
+        Test that the availability line follows room states, and bookings once refreshed by the cron.
+        """
+        availability = self._availability()
+        self.assertEqual((availability.free_beds, availability.room_count), (5, 2))
+
+        self.rooms[0]._reserve_beds(2)
+        self.assertEqual(availability.free_beds, 5)
+        self.Availability._cron_refresh()
+        self.assertEqual(availability.free_beds, 3)
+
+        self.rooms[1].action_set_under_maintenance()
+        self.assertEqual((availability.free_beds, availability.room_count), (0, 1))
+
+    def test_find_available_beds(self):
+        """
+        Test finding several beds at once, without booking them.
+        """
+        find = self.Availability.find_available_beds
+        self.assertEqual(find(self.clinic.id, 'standard', [], count=1), [])
+        self.assertEqual(find(self.clinic.id, 'standard', self.service.ids, count=6), [])
+
+        allocation = find(self.clinic.id, 'standard', self.service.ids, count=4)
+        self.assertEqual(allocation, [
+            {'room_id': self.rooms[1].id, 'beds': 3},
+            {'room_id': self.rooms[0].id, 'beds': 1},
+        ])
+        self.assertEqual(self.rooms.mapped('booked_beds'), [0, 0])
+
+    def test_reserve_available_beds(self):
+        """
+        Test reserving beds for several admissions at once, each bed held by a bed slot.
+        """
+        user = self.env['res.users'].create({'name': 'Patient User', 'login': 'availability_patient_user'})
+        patient = self.env['patient'].create({'name': 'Test Patient', 'user_id': user.id})
+        admissions = self.env['patient.admission'].create([{
+            'patient_id': patient.id,
+            'room_id': self.rooms[0].id,
+            'room_type': 'standard',
+        } for _i in range(4)])
+        find = self.Availability.find_available_beds
+
+        allocation = find(self.clinic.id, 'standard', self.service.ids, admissions=admissions)
+        self.assertEqual(allocation, [
+            {'room_id': self.rooms[1].id, 'beds': 3},
+            {'room_id': self.rooms[0].id, 'beds': 1},
+        ])
+        self.assertEqual(admissions.mapped('room_id'), self.rooms[1] | self.rooms[0])
+        self.assertEqual(set(admissions.mapped('state')), {'in_progress'})
+        self.assertEqual(len(admissions.bed_slot_ids), 4)
+        self.assertEqual(self.rooms.mapped('booked_beds'), [1, 3])
+
+        with self.assertRaises(ValidationError):
+            find(self.clinic.id, 'standard', self.service.ids, admissions=admissions)
+
+        admissions.action_discharge()
+        self.assertEqual(self.rooms.mapped('booked_beds'), [0, 0])